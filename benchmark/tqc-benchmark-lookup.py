@@ -0,0 +1,41 @@
+"""
+Lookup benchmark: scanning the Nanowire structure against the position/particle index
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.abspath('../'))
+from package import lattice
+from package.utility import Utility
+
+def benchmark(k, queries=200):
+    """
+    Time per query: scan, index
+    """
+    nanowire_obj = lattice.lattice_nanowire(lattice.grid_config(1, k))
+    positions = [pos for pos in nanowire_obj.slots if not pos.startswith('m')]
+    random.seed(k)
+    particles = random.sample(positions, 2*k)
+    nanowire_obj.initiate_nanowire(particles)
+    queries = [random.choice(particles) for _ in range(queries)]
+    braids = [str(par+1) for par in range(len(particles))]
+
+    start = time.perf_counter()
+    scan = [Utility.get_intersection(nanowire_obj.nanowire, pos) for pos in queries]
+    scan_positions = Utility().get_positions_from_braids(nanowire_obj.nanowire, braids)
+    scanned = (time.perf_counter()-start)/len(queries)
+    start = time.perf_counter()
+    index = [nanowire_obj.get_intersection(pos) for pos in queries]
+    index_positions = nanowire_obj.get_positions(braids)
+    indexed = (time.perf_counter()-start)/len(queries)
+    assert all(i1 is i2 for i1, i2 in zip(scan, index))
+    assert scan_positions == index_positions
+    return len(particles), scanned, indexed
+
+if __name__ == '__main__':
+    print("intersections,particles,scan (us),index (us),speedup")
+    for k in [2, 8, 32, 128, 512]:
+        n, scanned, indexed = benchmark(k)
+        print("{},{},{:.1f},{:.2f},{:.0f}x".format(k, n, scanned*1e6, indexed*1e6, scanned/indexed))
@@ -0,0 +1,84 @@
+"""
+Routing benchmark: query time against the # intersections of a chain (1 x k lattice) of X-junctions,
+and the (opt-in) A* router against BFS and the hierarchy (time, # expanded vertices) on square lattices
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.abspath('../'))
+from package import graph, hierarchy, lattice
+
+def benchmark(k, queries=200):
+    """
+    Time per query: BFS, hierarchical
+    """
+    nanowire_obj = lattice.lattice_nanowire(lattice.grid_config(1, k))
+    vertices = nanowire_obj.vertices
+    start = time.perf_counter()
+    router = hierarchy.Hierarchy(nanowire_obj.graph,
+        hierarchy.intersection_clusters(nanowire_obj.graph, nanowire_obj.nanowire))
+    build = time.perf_counter()-start
+
+    random.seed(k)
+    pairs = [(random.randrange(len(vertices)), random.randrange(len(vertices)))
+             for _ in range(queries)]
+    start = time.perf_counter()
+    paths = [graph.shortest_path(nanowire_obj.graph, p1, p2) for p1, p2 in pairs]
+    flat = (time.perf_counter()-start)/queries
+    start = time.perf_counter()
+    steps = [router.get_steps(p1, p2) for p1, p2 in pairs]
+    query = (time.perf_counter()-start)/queries
+    for path, step, (p1, p2) in zip(paths, steps, pairs):
+        assert len(path)-1 == step
+        assert len(router.get_path(p1, p2)) == len(path)
+    return len(vertices), build, flat, query
+
+def bfs_expanded(pathlength, end):
+    """
+    # vertices BFS expands before it reaches end (every level closer than end)
+    """
+    return sum(1 for steps in pathlength if 0 <= steps < pathlength[end])
+
+def benchmark_astar(rows, queries=100):
+    """
+    Time per query: BFS, A*, hierarchical, and # expanded vertices per query: BFS, A*
+    """
+    nanowire_obj = lattice.lattice_nanowire(lattice.grid_config(rows, rows))
+    network = nanowire_obj.graph
+    random.seed(rows)
+    pairs = [(random.randrange(len(network)), random.randrange(len(network)))
+             for _ in range(queries)]
+
+    start = time.perf_counter()
+    trees = [graph.bfs_tree(network, p1, p2) for p1, p2 in pairs]
+    flat = (time.perf_counter()-start)/queries
+    start = time.perf_counter()
+    searches = [graph.astar_tree(network, p1, p2, nanowire_obj.coordinates, nanowire_obj.scale)
+                for p1, p2 in pairs]
+    astar = (time.perf_counter()-start)/queries
+    router = hierarchy.Hierarchy(network, hierarchy.intersection_clusters(network, nanowire_obj.nanowire))
+    start = time.perf_counter()
+    steps = [router.get_steps(p1, p2) for p1, p2 in pairs]
+    query = (time.perf_counter()-start)/queries
+
+    flat_expanded = 0
+    astar_expanded = 0
+    for (_, pathlength), (_, distance, expanded), step, (_, p2) in zip(trees, searches, steps, pairs):
+        assert pathlength[p2] == distance[p2] == step
+        flat_expanded += bfs_expanded(pathlength, p2)
+        astar_expanded += expanded
+    return len(network), flat, astar, query, flat_expanded/queries, astar_expanded/queries
+
+if __name__ == '__main__':
+    print("intersections,vertices,hierarchy build (s),BFS query (us),hierarchy query (us)")
+    for k in [4, 8, 16, 32, 64, 128]:
+        n, build, flat, query = benchmark(k)
+        print("{},{},{:.3f},{:.1f},{:.1f}".format(k, n, build, flat*1e6, query*1e6))
+
+    print("\nintersections,vertices,BFS query (us),A* query (us),hierarchy query (us),BFS expanded,A* expanded")
+    for rows in [4, 8, 16, 32]:
+        n, flat, astar, query, flat_expanded, astar_expanded = benchmark_astar(rows)
+        print("{},{},{:.1f},{:.1f},{:.1f},{:.1f},{:.1f}".format(rows*rows, n, flat*1e6, astar*1e6,
+              query*1e6, flat_expanded, astar_expanded))
@@ -0,0 +1,96 @@
+"""
+Scaling benchmark: Nanowire compile time against the # intersections of a chain (1 x k lattice)
+of X-junctions - the Hadamard braid sequence on the particles of x1 (as the double-x gate),
+and the bandwidth of the Adjacency matrix in a shuffled (set) vertex order against the RCM order
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import yaml
+sys.path.append(os.path.abspath('../'))
+from package import graph, lattice, nanowire, runner
+from package.nanowire import Nanowire
+from package.compiler import Compiler
+from package.utility import Utility
+from package.braid import BraidingHadamard
+
+SEQUENCE = [(3, 4), (2, 4), (2, 3)]
+FILES = ('particle-positions-nanowire.csv', 'particle-movements.csv',
+         'nanowire-states.csv', 'particle-positions-braid.csv')
+
+def get_positions(config):
+    """
+    The particles on the 1st and the 3rd (free) branches of x1 - b,b',f',f of the double-x gate
+    """
+    branches = config.get('structure').get('x1')
+    return branches[0].split(',') + list(reversed(branches[2].split(',')))
+
+def bandwidth(vertices, structure, links):
+    """
+    Bandwidth of the Adjacency matrix of the vertex order
+    """
+    edges = nanowire.construct_adj_edges(vertices, structure, links)
+    return graph.matrix_bandwidth(graph.compile_edges(edges, len(vertices), vertices))
+
+def benchmark(k):
+    """
+    Time of every stage: load (nanowire.yml), preprocess (vertex order, edges), initiate
+    (Nanowire object, cutoff voltage pairs, hierarchy, particles), compile (braid sequence)
+    """
+    text = yaml.safe_dump(lattice.grid_config(1, k), sort_keys=False)
+
+    start = time.perf_counter()
+    config = yaml.safe_load(text)
+    structure = config.get('structure')
+    nanowire_structure = nanowire.nanowire_yaml_to_structure_branches(structure)
+    nanowire_links = nanowire.nanowire_yaml_to_links(structure)
+    intersections = nanowire.nanowire_yaml_to_structure_intersections(structure)
+    loaded = time.perf_counter()
+
+    vertices = nanowire.order_nanowire_vertices(config.get('vertices').split(','),
+                                                nanowire_structure, nanowire_links)
+    edges = nanowire.construct_adj_edges(vertices, nanowire_structure, nanowire_links)
+    preprocessed = time.perf_counter()
+
+    positions = get_positions(config)
+    nanowire_obj = Nanowire(graph.compile_edges(edges, len(vertices), vertices), vertices, intersections)
+    nanowire_obj.initiate_positions_inner_outer()
+    nanowire_obj.initiate_cutoff_voltage_pairs_adj()
+    nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+    nanowire_obj.initiate_hierarchy()
+    nanowire_obj.initiate_nanowire(positions)
+    nanowire_obj.initiate_voltage_engine()
+    utility = Utility(config.get('voltages'))
+    braid = BraidingHadamard(nanowire_obj, Compiler(SEQUENCE, [0]*len(SEQUENCE), positions))
+    initiated = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = tuple(os.path.join(tmp, file) for file in FILES)
+        with contextlib.redirect_stdout(io.StringIO()):
+            begin = time.perf_counter()
+            final = runner.braid_sequence(braid, utility, files, False)
+            compiled = time.perf_counter()-begin
+
+    shuffled = config.get('vertices').split(',')
+    random.seed(k)
+    random.shuffle(shuffled)
+    bands = (bandwidth(shuffled, nanowire_structure, nanowire_links),
+             graph.matrix_bandwidth(nanowire_obj.graph))
+    assert bands[1] <= bands[0]
+    assert len(utility.voltages) == len(nanowire_obj.cutoff_pairs_adj)
+    assert final == [positions[0], positions[3], positions[2], positions[1]]
+    return (len(nanowire_obj.nanowire), len(vertices), loaded-start,
+            preprocessed-loaded, initiated-preprocessed, compiled, bands)
+
+if __name__ == '__main__':
+    print("intersections,vertices,load (ms),preprocess (ms),initiate (ms),compile (ms),total (ms),"
+          "bandwidth (shuffled),bandwidth (RCM)")
+    for k in [2, 4, 8, 16, 32, 64, 128, 256]:
+        n_k, n, loaded, preprocessed, initiated, compiled, bands = benchmark(k)
+        print("{},{},{:.1f},{:.1f},{:.1f},{:.1f},{:.1f},{},{}".format(n_k, n, loaded*1e3, preprocessed*1e3,
+              initiated*1e3, compiled*1e3, (loaded+preprocessed+initiated+compiled)*1e3, *bands))
@@ -0,0 +1,79 @@
+"""
+State benchmark: the Nanowire data structure against the compact (array-backed) State,
+and a candidate move applied in place (and rolled back) against a copied update,
+and the interned (hashable) state of a move against a serialized key
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+import tracemalloc
+sys.path.append(os.path.abspath('../'))
+from package import lattice, state
+from package.utility import Utility
+
+def size(build):
+    """
+    Memory (bytes) allocated by build()
+    """
+    tracemalloc.start()
+    obj = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, current
+
+def timed(func, repeat):
+    """
+    Time (s) per call of func()
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter()-start)/repeat
+
+def benchmark(n, repeat=20):
+    """
+    Memory, copy and update time of the structure and the State of a ~n position lattice
+    """
+    config = lattice.grid_config(1, max(1, (n-3)//5))
+    structure = lattice.lattice_structure(config)
+    nanowire, mem_nw = size(lambda: copy.deepcopy(structure))
+    compact, mem_st = size(lambda: state.structure_to_state(structure))
+    random.seed(n)
+    positions = random.sample(list(compact.names), len(compact.names)//10)
+
+    copy_nw = timed(lambda: copy.deepcopy(nanowire), repeat)
+    copy_st = timed(compact.copy, repeat)
+    update_nw = timed(lambda: Utility.update_nanowire(nanowire, positions), repeat)
+    update_st = timed(lambda: compact.copy().update_positions(positions), repeat)
+
+    nanowire_obj = lattice.lattice_nanowire(config)
+    nanowire_obj.apply_positions(positions)
+    moved = copy.copy(positions)
+    moved[0] = random.choice([pos for pos in compact.names if pos not in positions])
+    delta = timed(lambda: nanowire_obj.undo_positions(nanowire_obj.apply_positions(moved)), repeat)
+    def frozen_key():
+        log = nanowire_obj.apply_positions(moved)
+        key = nanowire_obj.get_state()
+        nanowire_obj.undo_positions(log)
+        return key
+    frozen = timed(frozen_key, repeat)
+    serialized = timed(lambda: str(Utility.update_nanowire(nanowire, moved)), repeat)
+    assert nanowire_obj.get_state() is nanowire_obj.get_state()
+    assert nanowire_obj.nanowire == Utility.update_nanowire(nanowire, positions)
+    assert state.structure_to_state(Utility.update_nanowire(nanowire, positions)).to_structure() ==\
+        Utility.update_nanowire(nanowire, positions)
+    return (len(compact.names), mem_nw, mem_st, copy_nw, copy_st, update_nw, update_st, delta,
+            frozen, serialized)
+
+if __name__ == '__main__':
+    print("positions,structure (KB),state (KB),structure copy (ms),state copy (ms),"
+          "structure update (ms),state update (ms),delta update (ms),frozen state key (ms),"
+          "serialized key (ms)")
+    for n in [100, 1000, 10000]:
+        res = benchmark(n)
+        print("{},{:.1f},{:.1f},{:.3f},{:.3f},{:.3f},{:.3f},{:.3f},{:.3f},{:.3f}".format(res[0],
+              res[1]/1024, res[2]/1024, res[3]*1e3, res[4]*1e3, res[5]*1e3, res[6]*1e3, res[7]*1e3,
+              res[8]*1e3, res[9]*1e3))
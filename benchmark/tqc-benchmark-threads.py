@@ -0,0 +1,107 @@
+"""
+Thread pool benchmark: independent braid sequences (the gates, every one on its own
+Nanowire) compiled one after another against compiled in a thread pool in one process
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath('../'))
+from package import nanowire, compiler, validation, metrics, artifact, runner
+from package.compiler import Compiler
+from package.utility import Utility
+from package.braid import Braiding, BraidingCNOT, BraidingHadamard, BraidingPauliX, BraidingPhaseS
+
+INPUTS = '../gate/inputs'
+GATES = {'cnot': BraidingCNOT, 'hadamard': BraidingHadamard,
+         'pauli-x': BraidingPauliX, 'phase-s': BraidingPhaseS}
+FILES = ('particle-positions-nanowire.csv', 'particle-movements.csv',
+         'nanowire-states.csv', 'particle-positions-braid.csv')
+
+def initiate_nanowire(gate, positions):
+    """
+    The Nanowire object of a gate, with the particles on the positions
+    """
+    file_structure = os.path.join(INPUTS, gate, 'nanowire-structure.csv')
+    structure = nanowire.read_nanowire_structure_as_branches(file_structure)
+    vertices = nanowire.order_nanowire_vertices(nanowire.extract_nanowire_vertices(structure), structure)
+    edges = nanowire.construct_adj_edges(vertices, structure)
+    nanowire_obj = artifact.compile_nanowire(vertices, edges,
+        nanowire.read_nanowire_structure_as_intersections(file_structure))
+    nanowire_obj.initiate_nanowire(positions)
+    return nanowire_obj
+
+def preprocess_positions(gate, positions, files):
+    """
+    The positions after the particle position preprocessing (as tqc-preprocess-positions.py)
+    """
+    with open(os.path.join(INPUTS, gate, 'circuit-config.csv')) as fr:
+        config = dict(line.strip().split('=') for line in fr if '=' in line)
+    nanowire_obj = initiate_nanowire(gate, positions)
+    nanowire_b = nanowire.read_nanowire_structure_as_branches(os.path.join(INPUTS, gate, 'nanowire-structure.csv'))
+    check, intersections, branches, particles = validation.validate_particle_positions(nanowire_obj,
+        nanowire_b, positions, config['branches'], config['group'])
+    if check is False and len(particles) > 2 and len(set(branches)) > 1:
+        braid = Braiding(nanowire_obj, Compiler(None, None, positions))
+        positions, _ = braid.move_particles(Utility(2*len(nanowire_obj.nanowire)), intersections,
+            branches, particles, config['branches'], files[1], files[2], gate)
+        metrics.update_final_particle_positions(files[0], positions)
+    return positions
+
+def job(gate, output):
+    """
+    The (braid, utility, files) of a gate, with its outputs in the given dir
+    """
+    os.makedirs(output)
+    files = tuple(os.path.join(output, file) for file in FILES)
+    positions = compiler.read_particle_positions(os.path.join(INPUTS, gate, 'initial-positions.csv'))
+    positions = preprocess_positions(gate, positions, files)
+    sequence, direction = compiler.read_braid_sequence(os.path.join(INPUTS, gate, 'braid-sequence.csv'))
+    nanowire_obj = initiate_nanowire(gate, positions)
+    compiler_obj = Compiler(sequence, direction, positions)
+    utility = Utility(2*len(nanowire_obj.nanowire))
+    return GATES[gate](nanowire_obj, compiler_obj), utility, files
+
+def outputs(jobs):
+    """
+    The contents of the output files of the jobs
+    """
+    res = []
+    for _, _, files in jobs:
+        for file in files:
+            with open(file) as fr:
+                res.append(fr.read())
+    return res
+
+def benchmark(copies, workers):
+    """
+    Time of the sequential and the thread pool compilation of copies x every gate
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            jobs_seq = [job(gate, os.path.join(tmp, 'seq', str(i), gate))
+                        for i in range(copies) for gate in GATES]
+            jobs_pool = [job(gate, os.path.join(tmp, 'pool', str(i), gate))
+                         for i in range(copies) for gate in GATES]
+            start = time.perf_counter()
+            for braid, utility, files in jobs_seq:
+                runner.braid_sequence(braid, utility, files, False)
+            sequential = time.perf_counter()-start
+
+            start = time.perf_counter()
+            runner.compile_pool(jobs_pool, workers)
+            pool = time.perf_counter()-start
+        assert outputs(jobs_seq) == outputs(jobs_pool)
+    return len(jobs_seq), sequential, pool
+
+if __name__ == '__main__':
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("# GIL {}".format('enabled' if gil else 'disabled (free-threaded)'))
+    print("braid sequences,workers,sequential (ms),thread pool (ms),speedup")
+    for copies in [1, 4, 16]:
+        for workers in [2, 4, 8]:
+            n, sequential, pool = benchmark(copies, workers)
+            print("{},{},{:.1f},{:.1f},{:.2f}".format(n, workers, sequential*1e3, pool*1e3, sequential/pool))
@@ -0,0 +1,55 @@
+"""
+Validation benchmark: the empty branch rule walking the Nanowire data structure
+against the precomputed bitboard masks, on generated lattices
+"""
+
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.abspath('../'))
+from package import lattice, validation
+
+def timed(func, repeat):
+    """
+    Time (s) per call of func()
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter()-start)/repeat
+
+def benchmark(rows, cols, repeat=20, samples=50):
+    """
+    Time of the empty branch rule (1 and 2 free branches) of random occupancies
+    (a particle per ~10 positions) with the structure walk and with the bitboard
+    """
+    nanowire_obj = lattice.lattice_nanowire(lattice.grid_config(rows, cols))
+    names = list(nanowire_obj.slots)
+    random.seed(rows*cols)
+    occupancies = [random.sample(names, max(2, len(names)//10)) for _ in range(samples)]
+    states = []
+    for positions in occupancies:
+        log = nanowire_obj.apply_positions(positions)
+        states.append((positions, [[[dict(tup) for tup in branch] for branch in intersection]
+                                   for intersection in nanowire_obj.nanowire]))
+        nanowire_obj.undo_positions(log)
+
+    bitboard = nanowire_obj.bitboard
+    for positions, structure in states:
+        for n in [1, 2]:
+            assert validation.validate_empty_branches(structure, n, '') ==\
+                bitboard.validate_empty_branches(positions, n)
+
+    walk = timed(lambda: [validation.validate_empty_branches(structure, n, '')
+                          for _, structure in states for n in [1, 2]], repeat)
+    masks = timed(lambda: [bitboard.validate_empty_branches(positions, n)
+                           for positions, _ in states for n in [1, 2]], repeat)
+    calls = 2*len(states)
+    return len(nanowire_obj.nanowire), len(names), walk/calls, masks/calls
+
+if __name__ == '__main__':
+    print("intersections,positions,structure walk (us),bitboard (us),speedup")
+    for rows, cols in [(1, 2), (2, 2), (4, 4), (8, 8), (16, 16)]:
+        k, n, walk, masks = benchmark(rows, cols)
+        print("{},{},{:.1f},{:.1f},{:.1f}".format(k, n, walk*1e6, masks*1e6, walk/masks))
@@ -13,6 +13,7 @@ file_gate_config="-config.yml"
 file_tqc_measurements="tqc-fusion.csv"
 file_nanowire_vertex="nanowire-vertices.csv"
 file_nanowire_matrix="nanowire-matrix.csv"
+file_nanowire_matrix_binary="nanowire-matrix.npy"
 file_nanowire_states="nanowire-states.csv"
 file_particle_movement="particle-movements.csv"
 file_particle_position_braid="particle-positions-braid.csv"
@@ -104,7 +105,9 @@ echo "Nanowire preprocessing started..."
 python tqc-preprocess-nanowire.py\
     $1/$file_nanowire_config\
     $OUTPUTS/$file_nanowire_vertex\
-    $OUTPUTS/$file_nanowire_matrix
+    $OUTPUTS/$file_nanowire_matrix\
+    edges\
+    $OUTPUTS/$file_nanowire_matrix_binary
 
 check=$?
 if [ "$check" -eq $RET_FALSE ];
@@ -176,7 +179,7 @@ echo "Braid and Nanowire animation started..."
 python tqc-animate.py \
     $1/$file_circuit_config\
     $1/$file_nanowire_config\
-    $OUTPUTS/$file_nanowire_matrix\
+    $OUTPUTS/$file_nanowire_matrix_binary\
     $OUTPUTS/$file_nanowire_vertex\
     $OUTPUTS/$file_nanowire_states\
     $OUTPUTS/$file_particle_position_braid\
@@ -191,6 +194,7 @@ fi
 echo "\033[0;32mBraid and Nanowire animation completed...\033[0m"
 
 rm $OUTPUTS/$file_nanowire_matrix
+rm $OUTPUTS/$file_nanowire_matrix_binary
 rm $OUTPUTS/$file_nanowire_vertex
 
 exit $RET_TRUE
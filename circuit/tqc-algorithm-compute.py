@@ -7,42 +7,58 @@ import sys
 import yaml
 sys.path.append(os.path.abspath('../'))
 
-from package import exception, graph, nanowire, compiler, braid, validation, metrics, utility
+from package import exception, nanowire, compiler, braid, validation, metrics, utility, artifact
 from package.braid import BraidingCNOT, BraidingHadamard, BraidingPauliX, BraidingPhaseS
 from package.nanowire import Nanowire
 from package.compiler import Compiler
 from package.braid import Braiding
-from package.utility import Utility
+from package.utility import Utility, BraidContext
 
-def initialize_nanowire(structure):
+def initialize_nanowire(nanowire_config, astar=False):
     """
     Initializing the Nanowire object which has
+    (matrix, vertex, nanowire, cutoff_adj, cutoff_opp)
     """
     try:
+        structure = nanowire_config.get('structure')
+        positions = nanowire_config.get('positions')
         nanowire_structure = nanowire.nanowire_yaml_to_structure_intersections(structure)
-        vertices = nanowire.read_nanowire_vertices(sys.argv[4])
-        matrix = graph.adjacency_matrix(sys.argv[5])
-        graph.validate_matrix(matrix)
-        nanowire_obj = Nanowire(matrix, vertices, nanowire_structure)
+        cache = artifact.load_artifact(artifact.artifact_file(
+            artifact.nanowire_key(structure, nanowire_config.get('vertices'), positions)))
+        if cache is not None:
+            nanowire_obj = artifact.artifact_nanowire(cache, nanowire_structure)
+        else:
+            vertices = nanowire.read_nanowire_vertices(sys.argv[4])
+            matrix = nanowire.read_nanowire_matrix(sys.argv[5], vertices)
+            nanowire_obj = Nanowire(matrix, vertices, nanowire_structure)
+            if positions is not None:
+                nanowire_obj.initiate_coordinates(nanowire.nanowire_yaml_to_coordinates(positions))
+            nanowire_obj.initiate_positions_inner_outer()
+            nanowire_obj.initiate_cutoff_voltage_pairs_adj()
+            nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+        nanowire_obj.initiate_oracle(artifact.CACHE_DIR)
+        if astar:
+            nanowire_obj.initiate_astar()
+        nanowire_obj.initiate_hierarchy()
         return nanowire_obj
     except IOError:
         raise
     except SyntaxError:
         raise
 
-def initiate_nanowire(nanowire_obj, positions):
-    """(matrix, vertex, nanowire, cutoff_adj, cutoff_opp)"""
+def initiate_nanowire(nanowire_obj, positions, constrained=False):
+    """Placing the particles, and the connectivity of the voltage gates (constrained routing)"""
     nanowire_obj.initiate_nanowire(positions)
-    nanowire_obj.initiate_positions_inner_outer()
-    nanowire_obj.initiate_cutoff_voltage_pairs_adj()
-    nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+    if constrained:
+        nanowire_obj.initiate_connectivity()
+    nanowire_obj.initiate_voltage_engine()
 
 def initialize_positions(nanowire_obj, groups):
     try:
         positions = compiler.read_particle_positions(sys.argv[6])
         if groups is not None:
             braid_positions = compiler.read_braid_positions(sys.argv[7])
-            positions = utility.get_positions_from_braids(nanowire_obj.nanowire, braid_positions)
+            positions = nanowire_obj.get_positions(braid_positions)
         return positions
     except IOError:
         raise
@@ -58,16 +74,16 @@ def initialize_compiler(gate, positions):
     except IOError:
         raise
 
-def get_braid_class(nanowire_obj, compiler_obj, gate):
+def get_braid_class(nanowire_obj, compiler_obj, gate, constrained=False):
     braid = None
     if gate == 'cnot':
-        braid = BraidingCNOT(nanowire_obj, compiler_obj)
+        braid = BraidingCNOT(nanowire_obj, compiler_obj, constrained)
     elif gate == 'hadamard':
-        braid = BraidingHadamard(nanowire_obj, compiler_obj)
+        braid = BraidingHadamard(nanowire_obj, compiler_obj, constrained)
     elif gate == 'pauli-x':
-        braid = BraidingPauliX(nanowire_obj, compiler_obj)
+        braid = BraidingPauliX(nanowire_obj, compiler_obj, constrained)
     elif gate == 'phase-s':
-        braid = BraidingPhaseS(nanowire_obj, compiler_obj)
+        braid = BraidingPhaseS(nanowire_obj, compiler_obj, constrained)
     return braid
 
 #
@@ -124,8 +140,7 @@ def braid_particles(nanowire_obj, compiler_obj, braid_obj, utility, groups):
                 pair0 = (braid_pos_mapping[pair[0]], braid_pos_mapping[pair[1]])
             print("\033[0;33m----- Braiding particles {} -----\033[0m".format(pair0))
 
-            intersection = Utility.get_intersection(nanowire_obj.nanowire, compiler_obj.positions[pair[0]-1])
-            condition = validation.check_unibranch_validity(pair, compiler_obj.positions, intersection)
+            condition = validation.check_unibranch_validity(pair, compiler_obj.positions, nanowire_obj)
 
             if condition:
                 braid_obj.braid_particles_same_branch(pair, utility, sys.argv[8], sys.argv[9])
@@ -157,9 +172,13 @@ if __name__ == '__main__':
             circuit = yaml.safe_load(stream1)
             nanowire_config = yaml.safe_load(stream2)
             structure = nanowire_config.get('structure')
-            nanowire_obj = initialize_nanowire(structure)
+            nanowire_obj = initialize_nanowire(nanowire_config, bool(circuit.get('astar')))
+            if circuit.get('memo'):
+                nanowire_obj.initiate_memo(int(circuit.get('memo')))
             nanowire_b = nanowire.nanowire_yaml_to_structure_branches(structure)
 
+            # the braiding context of the run carries over the gates of the circuit
+            context = BraidContext()
             i = -1
             for gate in circuit.get('gates'):
                 i += 1
@@ -168,10 +187,11 @@ if __name__ == '__main__':
                     gate_config = yaml.safe_load(stream)
                     positions = initialize_positions(nanowire_obj, groups)
                     if i == 0:
-                        initiate_nanowire(nanowire_obj, positions)
+                        initiate_nanowire(nanowire_obj, positions, circuit.get('routing') == 'constrained')
                     compiler_obj = initialize_compiler(gate_config, positions)
-                    braid_obj = get_braid_class(nanowire_obj, compiler_obj, gate)
-                    utility = Utility()
+                    braid_obj = get_braid_class(nanowire_obj, compiler_obj, gate,
+                        circuit.get('routing') == 'constrained')
+                    utility = Utility(nanowire_config.get('voltages', 2*len(nanowire_obj.nanowire)), context)
 
                     print('\n\033[1;36mStarted {} preprocessing...\033[0m'.format(gate))
                     preprocess_positions(gate_config, nanowire_obj, nanowire_b, compiler_obj, braid_obj, positions, utility)
@@ -6,19 +6,43 @@ import os
 import sys
 import yaml
 sys.path.append(os.path.abspath('../'))
-from package import nanowire
+from package import nanowire, graph, artifact
 
 if __name__ == '__main__':
     res = 1
     try:
         with open(sys.argv[1]) as stream:
             nanowire_config = yaml.safe_load(stream)
-            vertices = nanowire_config.get('vertices').split(',')
-            nanowire.print_nanowire_vertices(sys.argv[2],vertices)
+            vertices = nanowire_config.get('vertices')
             structure = nanowire_config.get('structure')
+            positions = nanowire_config.get('positions')
             nanowire_structure = nanowire.nanowire_yaml_to_structure_branches(structure)
-            nanowire_adj_matrix = nanowire.construct_adj_matrix(vertices,nanowire_structure)
-            nanowire.print_adj_matrix(sys.argv[3],nanowire_adj_matrix)
+            nanowire_links = nanowire.nanowire_yaml_to_links(structure)
+            file_artifact = artifact.artifact_file(artifact.nanowire_key(structure, vertices, positions))
+            cache = artifact.load_artifact(file_artifact)
+            if cache is not None:
+                vertices = [str(v) for v in cache['vertices']]
+                nanowire_adj_edges = artifact.artifact_edges(cache)
+            else:
+                vertices = nanowire.order_nanowire_vertices(vertices.split(','), nanowire_structure, nanowire_links)
+                nanowire_adj_edges = nanowire.construct_adj_edges(vertices,nanowire_structure,nanowire_links)
+                coordinates = None
+                if positions is not None:
+                    coordinates = nanowire.nanowire_yaml_to_coordinates(positions)
+                nanowire_obj = artifact.compile_nanowire(vertices, nanowire_adj_edges,
+                    nanowire.nanowire_yaml_to_structure_intersections(structure), coordinates)
+                artifact.save_artifact(file_artifact, nanowire_obj, nanowire_adj_edges, coordinates)
+            nanowire.print_nanowire_vertices(sys.argv[2],vertices)
+            if len(sys.argv) > 4 and sys.argv[4] == 'binary':
+                graph.save_matrix(sys.argv[3], graph.edges_to_matrix(nanowire_adj_edges, len(vertices)))
+            elif len(sys.argv) > 4 and sys.argv[4] == 'dense':
+                nanowire_adj_matrix = nanowire.construct_adj_matrix(vertices,nanowire_structure,nanowire_adj_edges)
+                nanowire.print_adj_matrix(sys.argv[3],nanowire_adj_matrix)
+            else:
+                nanowire.print_adj_edges(sys.argv[3],nanowire_adj_edges)
+            # the binary matrix (of the animation) next to the edge list
+            if len(sys.argv) > 5:
+                graph.save_matrix(sys.argv[5], graph.edges_to_matrix(nanowire_adj_edges, len(vertices)))
         res = 0
     except IOError as err:
         print(err)
@@ -10,6 +10,7 @@ file_nanowire_positions="nanowire-positions.csv"
 file_tqc_measurements="tqc-fusion.csv"
 file_nanowire_vertex="nanowire-vertices.csv"
 file_nanowire_matrix="nanowire-matrix.csv"
+file_nanowire_matrix_binary="nanowire-matrix.npy"
 file_particle_position_current="particle-positions-current.csv"
 file_particle_movement="particle-movements.csv"
 file_nanowire_states="nanowire-states.csv"
@@ -177,7 +178,9 @@ echo "Nanowire preprocessing started..."
 python tqc-preprocess-nanowire.py\
     $1/$file_nanowire_str\
     $OUTPUTS/$file_nanowire_vertex\
-    $OUTPUTS/$file_nanowire_matrix
+    $OUTPUTS/$file_nanowire_matrix\
+    edges\
+    $OUTPUTS/$file_nanowire_matrix_binary
 
 check=$?
 if [ "$check" -eq $RET_FALSE ];
@@ -290,7 +293,7 @@ echo "\033[0;34m################################################################
 
 echo "Braid and Nanowire animation started..."
 python tqc-animate.py \
-    $OUTPUTS/$file_nanowire_matrix\
+    $OUTPUTS/$file_nanowire_matrix_binary\
     $OUTPUTS/$file_nanowire_vertex\
     $1/$file_nanowire_positions\
     $OUTPUTS/$file_nanowire_states\
@@ -307,6 +310,7 @@ fi
 echo "\033[0;32mBraid and Nanowire animation completed...\033[0m"
 
 rm $OUTPUTS/$file_nanowire_matrix
+rm $OUTPUTS/$file_nanowire_matrix_binary
 rm $OUTPUTS/$file_nanowire_vertex
 rm $OUTPUTS/$file_particle_position_current
 
@@ -2,14 +2,13 @@ import os
 import sys
 sys.path.append(os.path.abspath('../'))
 
-from package import graph
 from package import exception
 from package import nanowire
 from package import compiler
 from package import braid
 from package import utility
-from package import metrics
-from package import validation
+from package import artifact
+from package import runner
 
 from package.compiler import Compiler
 from package.nanowire import Nanowire
@@ -36,15 +35,26 @@ def initialize_nanowire(positions):
     """
     try:
         structure = nanowire.read_nanowire_structure_as_intersections(sys.argv[1])
-        vertex = nanowire.read_nanowire_vertices(sys.argv[2])
-        matrix = graph.adjacency_matrix(sys.argv[3])
-        graph.validate_matrix(matrix)
-        nanowire_obj = Nanowire(matrix, vertex, structure)
+        cache = artifact.load_artifact(artifact.artifact_file(artifact.structure_file_key(sys.argv[1])))
+        if cache is not None:
+            nanowire_obj = artifact.artifact_nanowire(cache, structure)
+        else:
+            vertex = nanowire.read_nanowire_vertices(sys.argv[2])
+            matrix = nanowire.read_nanowire_matrix(sys.argv[3], vertex)
+            nanowire_obj = Nanowire(matrix, vertex, structure)
+            file_positions = os.path.join(os.path.dirname(sys.argv[1]), 'nanowire-positions.csv')
+            if os.path.isfile(file_positions):
+                nanowire_obj.initiate_coordinates(nanowire.read_nanowire_coordinates(file_positions))
+            nanowire_obj.initiate_positions_inner_outer()
+            nanowire_obj.initiate_cutoff_voltage_pairs_adj()
+            nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+        nanowire_obj.initiate_oracle(artifact.CACHE_DIR)
+        nanowire_obj.initiate_hierarchy()
 
         nanowire_obj.initiate_nanowire(positions)
-        nanowire_obj.initiate_positions_inner_outer()
-        nanowire_obj.initiate_cutoff_voltage_pairs_adj()
-        nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+        if len(sys.argv) > 10 and sys.argv[10] == 'constrained':
+            nanowire_obj.initiate_connectivity()
+        nanowire_obj.initiate_voltage_engine()
         return nanowire_obj
     except IOError:
         raise
@@ -53,15 +63,16 @@ def initialize_nanowire(positions):
 
 def get_braid_class(nanowire_obj, compiler_obj):
     gate = sys.argv[9]
+    constrained = len(sys.argv) > 10 and sys.argv[10] == 'constrained'
     braid = None
     if gate == 'cnot':
-        braid = BraidingCNOT(nanowire_obj, compiler_obj)
+        braid = BraidingCNOT(nanowire_obj, compiler_obj, constrained)
     elif gate == 'hadamard':
-        braid = BraidingHadamard(nanowire_obj, compiler_obj)
+        braid = BraidingHadamard(nanowire_obj, compiler_obj, constrained)
     elif gate == 'pauli-x':
-        braid = BraidingPauliX(nanowire_obj, compiler_obj)
+        braid = BraidingPauliX(nanowire_obj, compiler_obj, constrained)
     elif gate == 'phase-s':
-        braid = BraidingPhaseS(nanowire_obj, compiler_obj)
+        braid = BraidingPhaseS(nanowire_obj, compiler_obj, constrained)
     return braid
 
 def braid_particles(nanowire_obj, compiler_obj):
@@ -71,29 +82,8 @@ def braid_particles(nanowire_obj, compiler_obj):
     try:
         braid = get_braid_class(nanowire_obj, compiler_obj)
         assert(braid is not None)
-        utility = Utility()
-        n = len(compiler_obj.positions)
-        line_pos = Utility.get_par_braid_pos(n)
-        metrics.update_particle_line_positions(sys.argv[8], (0,0), line_pos)
-        for i in range(len(compiler_obj.sequence)):
-            pair = compiler_obj.sequence[i]
-            dir  = compiler_obj.direction[i]
-            utility.reset_variables(compiler_obj.positions)
-            utility.refresh_zero_modes()
-            print("----- Braiding particles {} -----".format(pair))
-
-            intersection = Utility.get_intersection(nanowire_obj.nanowire, compiler_obj.positions[pair[0]-1])
-            condition = validation.check_unibranch_validity(pair, compiler_obj.positions, intersection)
-
-            if condition:
-                braid.braid_particles_same_branch(pair, utility, sys.argv[6], sys.argv[7])
-            else:
-                braid.braid_particles_diff_branch(pair, utility, sys.argv[6], sys.argv[7])
-
-            line_pos = Utility.update_par_braid_pos(line_pos, pair)
-            metrics.update_particle_line_positions(sys.argv[8], pair, line_pos)
-
-        metrics.update_final_particle_positions(sys.argv[5], compiler_obj.positions)
+        utility = Utility(2*len(nanowire_obj.nanowire))
+        runner.braid_sequence(braid, utility, (sys.argv[5], sys.argv[6], sys.argv[7], sys.argv[8]))
         print("----- Braiding completed -----")
     except exception.NoEmptyPositionException:
         print("----- Braiding interrupted -----")
@@ -5,16 +5,39 @@ Nanowire preprocessing
 import os
 import sys
 sys.path.append(os.path.abspath('../'))
-from package import nanowire
+from package import nanowire, graph, artifact
 
 if __name__ == '__main__':
     res = 1
     try:
         nanowire_structure = nanowire.read_nanowire_structure_as_branches(sys.argv[1])
-        nanowire_vertices = nanowire.extract_nanowire_vertices(nanowire_structure)
+        file_artifact = artifact.artifact_file(artifact.structure_file_key(sys.argv[1]))
+        cache = artifact.load_artifact(file_artifact)
+        if cache is not None:
+            nanowire_vertices = [str(v) for v in cache['vertices']]
+            nanowire_adj_edges = artifact.artifact_edges(cache)
+        else:
+            nanowire_vertices = nanowire.extract_nanowire_vertices(nanowire_structure)
+            nanowire_vertices = nanowire.order_nanowire_vertices(nanowire_vertices, nanowire_structure)
+            nanowire_adj_edges = nanowire.construct_adj_edges(nanowire_vertices,nanowire_structure)
+            coordinates = None
+            file_positions = os.path.join(os.path.dirname(sys.argv[1]), 'nanowire-positions.csv')
+            if os.path.isfile(file_positions):
+                coordinates = nanowire.read_nanowire_coordinates(file_positions)
+            nanowire_obj = artifact.compile_nanowire(nanowire_vertices, nanowire_adj_edges,
+                nanowire.read_nanowire_structure_as_intersections(sys.argv[1]), coordinates)
+            artifact.save_artifact(file_artifact, nanowire_obj, nanowire_adj_edges, coordinates)
         nanowire.print_nanowire_vertices(sys.argv[2],nanowire_vertices)
-        nanowire_adj_matrix = nanowire.construct_adj_matrix(nanowire_vertices,nanowire_structure)
-        nanowire.print_adj_matrix(sys.argv[3],nanowire_adj_matrix)
+        if len(sys.argv) > 4 and sys.argv[4] == 'binary':
+            graph.save_matrix(sys.argv[3], graph.edges_to_matrix(nanowire_adj_edges, len(nanowire_vertices)))
+        elif len(sys.argv) > 4 and sys.argv[4] == 'dense':
+            nanowire_adj_matrix = nanowire.construct_adj_matrix(nanowire_vertices,nanowire_structure,nanowire_adj_edges)
+            nanowire.print_adj_matrix(sys.argv[3],nanowire_adj_matrix)
+        else:
+            nanowire.print_adj_edges(sys.argv[3],nanowire_adj_edges)
+        # the binary matrix (of the animation) next to the edge list
+        if len(sys.argv) > 5:
+            graph.save_matrix(sys.argv[5], graph.edges_to_matrix(nanowire_adj_edges, len(nanowire_vertices)))
         res = 0
     except IOError as err:
         print(err)
@@ -6,7 +6,7 @@ import os
 import sys
 sys.path.append(os.path.abspath('../'))
 
-from package import exception, graph, nanowire, compiler, braid, validation, metrics
+from package import exception, nanowire, compiler, braid, validation, metrics, artifact
 from package.nanowire import Nanowire
 from package.compiler import Compiler
 from package.braid import Braiding
@@ -18,13 +18,23 @@ def initialize_nanowire(positions, file1, file2, file3):
     """
     try:
         structure = nanowire.read_nanowire_structure_as_intersections(file1)
-        vertex = nanowire.read_nanowire_vertices(file2)
-        matrix = graph.adjacency_matrix(file3)
-        graph.validate_matrix(matrix)
-        nanowire_obj = Nanowire(matrix, vertex, structure)
+        cache = artifact.load_artifact(artifact.artifact_file(artifact.structure_file_key(file1)))
+        if cache is not None:
+            nanowire_obj = artifact.artifact_nanowire(cache, structure)
+        else:
+            vertex = nanowire.read_nanowire_vertices(file2)
+            matrix = nanowire.read_nanowire_matrix(file3, vertex)
+            nanowire_obj = Nanowire(matrix, vertex, structure)
+            file_positions = os.path.join(os.path.dirname(file1), 'nanowire-positions.csv')
+            if os.path.isfile(file_positions):
+                nanowire_obj.initiate_coordinates(nanowire.read_nanowire_coordinates(file_positions))
+            nanowire_obj.initiate_positions_inner_outer()
+            nanowire_obj.initiate_cutoff_voltage_pairs_adj()
+            nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+        nanowire_obj.initiate_oracle(artifact.CACHE_DIR)
+        nanowire_obj.initiate_hierarchy()
 
         nanowire_obj.initiate_nanowire(positions)
-        nanowire_obj.initiate_positions_inner_outer()
         return nanowire_obj
     except IOError:
         raise
@@ -43,7 +53,7 @@ if __name__ == '__main__':
         if check is False and len(particles) > 2 and len(set(branches)) > 1:
             compiler_obj = Compiler(None, None, positions)
             braid = Braiding(nanowire_obj, compiler_obj)
-            utility = Utility()
+            utility = Utility(2*len(nanowire_obj.nanowire))
             final_positions, pair = braid.move_particles(utility, intersections, branches, particles, sys.argv[8], sys.argv[6], sys.argv[7], sys.argv[10])
             metrics.update_final_particle_positions(sys.argv[5], final_positions)
 
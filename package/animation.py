@@ -35,6 +35,7 @@ import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.animation as anima
+from . import graph, nanowire
 
 class Animation:
     """
@@ -43,8 +44,6 @@ class Animation:
         B. Nanowire Particle movements animation using Networkx
     """
 
-    labels_old = None
-
     ################################################################################
     # Initialization
     def __init__(self, gate, output):
@@ -64,6 +63,7 @@ class Animation:
         self.par_n = 0
         self.graph = None
         self.output = output
+        self.labels_old = None
 
     def initiate_file_io(self, argv):
         """
@@ -82,10 +82,13 @@ class Animation:
     # File I/O
     def read_nanowire_matrix(self, file):
         """
-        1. Reading the Nanowire graph matrix
+        1. Reading the Nanowire graph matrix (memory-mapped if binary)
         """
         matrix = []
         try:
+            if graph.is_adjacency_binary(file):
+                self.matrix = graph.load_matrix(file)
+                return
             file_read = open(file, 'r')
             line = file_read.readline()
             line = line.strip()
@@ -135,7 +138,7 @@ class Animation:
                     line = line.strip()
                     row = line.split(',')
                     node = row[0]
-                    if len(node) == 3 and 'x' in node:
+                    if nanowire.is_voltage_gate_node(node):
                         pos_x = float(row[1])
                         pos_y = float(row[2])
                         pos_volt[node] = np.array([pos_x, pos_y])
@@ -217,7 +220,7 @@ class Animation:
                 pos_arr = np.array([float(pos[0]), float(pos[1])])
             elif re.search('\d', pos[0]):
                 pos_arr = np.array([int(pos[0]), int(pos[1])])
-            if len(key) == 3 and 'x' in key:
+            if nanowire.is_voltage_gate_node(key):
                 pos_volt[key] = pos_arr
             else:
                 pos_par[key] = pos_arr
@@ -476,21 +479,21 @@ class Animation:
             # relabling nodes
             labels = {**label_empty, **label_par, **label_gates}
             mapping = dict()
-            if Animation.labels_old is None:
-                Animation.labels_old = labels
+            if self.labels_old is None:
+                self.labels_old = labels
                 mapping = labels
                 for n in G.nodes():
                     if n in mapping.keys() and n is mapping[n]:
                         mapping.pop(n)
             else:
-                for k in Animation.labels_old.keys():
-                    key = Animation.labels_old[k]
+                for k in self.labels_old.keys():
+                    key = self.labels_old[k]
                     val = labels[k]
                     if key is '' or val is '':
                         continue
                     if key is not val:
                         mapping[key] = val
-                Animation.labels_old = labels
+                self.labels_old = labels
             if mapping:
                 # if len(mapping) == 2:
                 #     k1 = list(mapping.keys())[0]
@@ -586,16 +589,7 @@ class Animation:
         """
         key = None
         gate = None
-        if flag is 0:
-            key = 'x11'
-            gate = 'Vg11'
-        elif flag is 1:
-            key = 'x13'
-            gate = 'Vg12'
-        elif flag is 2:
-            key = 'x21'
-            gate = 'Vg21'
-        elif flag is 3:
-            key = 'x23'
-            gate = 'Vg22'
+        if flag >= 0:
+            key = nanowire.voltage_gate_node(flag//2+1, 2*(flag%2)+1)
+            gate = "{}{}{}".format('Vg', flag//2+1, flag%2+1)
         return key, gate
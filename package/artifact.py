@@ -0,0 +1,152 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Artifact
+
+Objectives:
+    1. Content-addressed cache of the compiled Nanowire
+    2. A single binary (.npz) artifact of the vertices, adjacency (edge list
+       and compiled graph), cutoff voltage pairs, inner/outer positions and
+       coordinates - keyed by a hash of the normalized Nanowire structure
+    3. Later stages (and runs) on an unchanged Nanowire load the artifact
+       instead of reconstructing the Nanowire from the text files
+
+Functions:
+    1. nanowire_key
+    2. structure_file_key
+    3. artifact_file
+    4. compile_nanowire
+    5. save_artifact
+    6. load_artifact
+    7. artifact_nanowire
+    8. artifact_edges
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from . import graph, nanowire
+from .nanowire import Nanowire
+
+ARTIFACT_VERSION = 1
+CACHE_DIR = '.tqc-cache'
+
+def nanowire_key(*parts):
+    """
+    Hash of the normalized Nanowire config (the parsed structure, vertices, coordinates)
+    """
+    data = json.dumps([ARTIFACT_VERSION] + list(parts), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def structure_file_key(file):
+    """
+    Key of the nanowire-structure.csv (and the nanowire-positions.csv next to it)
+    """
+    try:
+        structure = nanowire.read_nanowire_structure_as_branches(file)
+        coordinates = None
+        file_positions = os.path.join(os.path.dirname(file), 'nanowire-positions.csv')
+        if os.path.isfile(file_positions):
+            coordinates = nanowire.read_nanowire_coordinates(file_positions)
+        return nanowire_key(structure, coordinates)
+    except IOError:
+        raise
+
+def artifact_file(key, cache_dir=CACHE_DIR):
+    """
+    The path of the artifact of the key, in the cache dir
+    """
+    return os.path.join(cache_dir, 'nanowire-{}.npz'.format(key))
+
+def compile_nanowire(vertices, edges, structure, coordinates=None):
+    """
+    The Nanowire object (on the compiled graph of the edge list) with its
+    inner/outer positions and cutoff voltage pairs
+    """
+    network = graph.compile_edges(edges, len(vertices), vertices)
+    nanowire_obj = Nanowire(network, vertices, structure)
+    nanowire_obj.initiate_positions_inner_outer()
+    nanowire_obj.initiate_cutoff_voltage_pairs_adj()
+    nanowire_obj.initiate_cutoff_voltage_pairs_opp()
+    if coordinates is not None:
+        nanowire_obj.initiate_coordinates(coordinates)
+    return nanowire_obj
+
+def save_artifact(file, nanowire_obj, edges, coordinates=None):
+    """
+    Saves the compiled Nanowire into the given (.npz) file
+    """
+    index = nanowire_obj.graph.index
+    cutoffs = {}
+    for key, cutoff_pairs in (('adj', nanowire_obj.cutoff_pairs_adj), ('opp', nanowire_obj.cutoff_pairs_opp)):
+        rows = [(i, index[p], index[q]) for i in range(len(cutoff_pairs)) for p, q in cutoff_pairs[i]]
+        cutoffs[key] = np.array(rows, dtype=np.int32).reshape(-1, 3)
+    coordinates = coordinates or {}
+    try:
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file, 'wb') as fw:
+            np.savez(fw,
+                     version=np.array(ARTIFACT_VERSION),
+                     vertices=np.array(nanowire_obj.vertices),
+                     edges=np.array(edges, dtype=np.int32).reshape(-1, 3),
+                     offsets=np.array(nanowire_obj.graph.offsets, dtype=np.int32),
+                     targets=np.array(nanowire_obj.graph.targets, dtype=np.int32),
+                     weights=np.array(nanowire_obj.graph.weights),
+                     inner=np.array([index[p] for p in nanowire_obj.inner], dtype=np.int32),
+                     outer=np.array([index[p] for p in nanowire_obj.outer], dtype=np.int32),
+                     gates=np.array(len(nanowire_obj.cutoff_pairs_adj)),
+                     cutoff_adj=cutoffs['adj'],
+                     cutoff_opp=cutoffs['opp'],
+                     coordinate_names=np.array(list(coordinates.keys()), dtype=str),
+                     coordinates=np.array(list(coordinates.values()), dtype=float).reshape(-1, 2))
+    except IOError:
+        raise
+
+def load_artifact(file):
+    """
+    Loads the arrays of the artifact from the given file, None if it doesn't
+    exist or was saved by another version
+    """
+    if not os.path.isfile(file):
+        return None
+    try:
+        with np.load(file) as data:
+            if int(data['version']) != ARTIFACT_VERSION:
+                return None
+            return dict((key, data[key]) for key in data.files)
+    except IOError:
+        raise
+
+def artifact_nanowire(artifact, structure):
+    """
+    The Nanowire object of the (loaded) artifact and the Nanowire data structure
+    """
+    vertices = [str(v) for v in artifact['vertices']]
+    network = graph.Graph(artifact['offsets'].tolist(), artifact['targets'].tolist(),
+                          artifact['weights'].tolist(), vertices)
+    nanowire_obj = Nanowire(network, vertices, structure)
+    nanowire_obj.inner = [vertices[p] for p in artifact['inner']]
+    nanowire_obj.outer = [vertices[p] for p in artifact['outer']]
+    for key in ('adj', 'opp'):
+        cutoff_pairs = [[] for _ in range(int(artifact['gates']))]
+        for i, p, q in artifact['cutoff_'+key]:
+            cutoff_pairs[i].append([vertices[p], vertices[q]])
+        setattr(nanowire_obj, 'cutoff_pairs_'+key, cutoff_pairs)
+        setattr(nanowire_obj, 'cutoff_masks_'+key, nanowire.cutoff_masks(cutoff_pairs))
+    if len(artifact['coordinate_names']) > 0:
+        coordinates = dict((str(v), tuple(xy)) for v, xy in
+                           zip(artifact['coordinate_names'], artifact['coordinates'].tolist()))
+        nanowire_obj.initiate_coordinates(coordinates)
+    return nanowire_obj
+
+def artifact_edges(artifact):
+    """
+    The adjacency edge list [(u, v, w)] of the (loaded) artifact
+    """
+    return [tuple(edge) for edge in artifact['edges'].tolist()]
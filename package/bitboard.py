@@ -0,0 +1,78 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Bitboard
+
+Objectives:
+    1. Precomputed (integer) bitmasks of the Nanowire rules
+    2. Every branch (of every intersection) is a bit of the branch bitboard, and
+       the occupied branches of the positions of the particles are an OR of masks
+    3. The empty branch rule (at least N empty branches in an intersection) is an
+       AND and a popcount per intersection, instead of walking every slot
+       (the empty positions of the braiding are read from the State of the Nanowire)
+
+Class: Bitboard
+
+Methods:
+    1. get_occupied_branches
+    2. validate_empty_branches
+
+Functions:
+    1. popcount
+"""
+
+class Bitboard:
+    """
+    Rule masks of a Nanowire
+        branch_of     - bitmask of the branches of every position
+        intersections - bitmask of the branches of every intersection which can be empty
+    """
+
+    def __init__(self, nanowire_obj):
+        self.branch_of = {}
+        self.intersections = []
+        j = -1
+        for intersection in nanowire_obj.nanowire:
+            branches = 0
+            for branch in intersection:
+                j += 1
+                dicts = 0
+                for tup in branch:
+                    if not isinstance(tup, dict):
+                        continue
+                    pos = list(tup.keys())[0]
+                    self.branch_of[pos] = self.branch_of.get(pos, 0) | (1 << j)
+                    dicts += 1
+                # (as validate_empty_branches) a branch with other entries is never empty
+                if dicts == len(branch):
+                    branches |= 1 << j
+            self.intersections.append(branches)
+
+    def get_occupied_branches(self, positions):
+        """
+        The bitmask of the branches with at least a particle
+        """
+        occupied = 0
+        for pos in positions:
+            occupied |= self.branch_of.get(pos, 0)
+        return occupied
+
+    def validate_empty_branches(self, positions, min_free_branch):
+        """
+        validate_empty_branches with the masks - 1 if an intersection has at least
+        min_free_branch empty branches, else 0
+        """
+        occupied = self.get_occupied_branches(positions)
+        for branches in self.intersections:
+            if popcount(branches & ~occupied) >= min_free_branch:
+                return 1
+        return 0
+
+def popcount(mask):
+    """
+    # set bits of the mask
+    """
+    return bin(mask).count('1')
@@ -28,14 +28,16 @@ Methods:
     4. code_block_validation
     5. code_block_inter_positions
     6. code_block_path
-    7. code_block_update_states
-    8. code_block_save_path_output
-    9. code_block_target_branch_config
-    10. code_block_target_position_config
+    7. code_block_alternative_path
+    8. code_block_constrained_path
+    9. code_block_update_states
+    10. code_block_save_path_output
+    11. code_block_target_branch_config
+    12. code_block_target_position_config
 """
 
 import copy
-from . import exception, graph, validation, metrics
+from . import exception, validation, metrics
 from .utility import Utility
 
 ################################################################################################
@@ -48,9 +50,10 @@ class Braiding:
     TYPE_INTER = 2
     TYPE_MOVE  = 0
 
-    def __init__(self, nanowire, compiler):
+    def __init__(self, nanowire, compiler, constrained=False):
         self.nanowire = nanowire
         self.compiler = compiler
+        self.constrained = constrained
 
     def braid_particles_same_branch(self, *args):
         """
@@ -61,10 +64,10 @@ class Braiding:
         file_mvmt = args[2]
         file_state = args[3]
         try:
-            utility.update_zero_modes(self.nanowire.nanowire)
+            utility.update_zero_modes(self.nanowire.zero_modes)
             voltages = utility.voltages
             pair0 = copy.copy(pair)
-            f_nw, final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
+            final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
 
             # 1.
             pair = self.get_1st_pair_sequence(pair)
@@ -73,24 +76,24 @@ class Braiding:
                 positions_temp = copy.copy(self.compiler.positions)
 
                 # getting the list of positions on free branches (intermediate positions)
-                inter_positions = Utility.get_intermediate_positions(self.nanowire.nanowire, pos_start)
+                inter_positions = self.nanowire.get_intermediate_positions(pos_start)
                 if dir is 1:
                     inter_positions = list(reversed(inter_positions))
 
-                f_nw, pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
+                pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
                     pair, par, voltages, utility, pos_start)
 
-                if pos_end is not None and f_nw is not None:
-                    self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                        pair0, file_mvmt, file_state, False, f_nw, True, True)
+                if pos_end is not None:
+                    self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                        pair0, file_mvmt, file_state, False, True, True)
 
             # 2.
             p_pair = self.get_2nd_pair_sequence(pair)
             for par in p_pair:
                 pos_start = self.compiler.positions[par-1]
                 pos_end = final_positions[par-1]
-                self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                    pair0, file_mvmt, file_state, True, None, True, True)
+                self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                    pair0, file_mvmt, file_state, True, True, True)
 
         except exception.NoEmptyPositionException:
             raise
@@ -127,7 +130,6 @@ class Braiding:
         try:
             # Getting the expected final positions after the braiding operation
             final_positions = Utility.get_final_positions(self.compiler.positions, pair)
-            f_nw = Utility.update_nanowire(self.nanowire.nanowire, final_positions)
 
             # getting the list of isolated particles
             positions_single = utility.get_isolated_particles(final_positions)
@@ -135,9 +137,9 @@ class Braiding:
             # validating final positions before moving forward with the braiding operation
             msg = "Error while trying to braid {}: {}, {} is an invalid state"\
                     .format(pair, final_positions, ','.join(voltages))
-            validation.validate_nanowire_state(f_nw, final_positions, utility,
+            validation.validate_nanowire_state(None, final_positions, utility,
                     positions_single, voltages, self.nanowire, Braiding.TYPE_FINAL, msg)
-            return f_nw, final_positions, positions_single
+            return final_positions, positions_single
         except exception.InvalidNanowireStateException:
             raise
 
@@ -148,20 +150,20 @@ class Braiding:
         # p_score = 0
         p_steps = 10
         pos_end = None
-        f_nw = None
         try:
+            # a single search ranks all the candidates (only the nearest can be picked)
+            distances = self.nanowire.get_distances(pos_start, inter_pos, True)
             for pos in inter_pos:
                 positions_temp[par-1] = pos
-                i_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
                 positions_single = utility.get_isolated_particles(positions_temp)
                 msg = "Error while trying to braid {}: {}, {} is an invalid state"\
                         .format(pair, positions_temp, ','.join(voltages))
 
                 # validating the change in nanowire state because of an intermediate position
-                score = validation.validate_nanowire_state(i_nw, positions_temp, utility,
-                        positions_single, voltages, self.nanowire, Braiding.TYPE_INTER, msg)
-                steps = Utility.get_steps(self.nanowire.matrix, self.nanowire.vertices,
-                        pos_start, pos)
+                # (the bitboard of the Nanowire checks the positions, only the picked one is applied)
+                score = validation.validate_nanowire_state(None, positions_temp,
+                        utility, positions_single, voltages, self.nanowire, Braiding.TYPE_INTER, msg)
+                steps = distances[pos]
                 p_pos = Utility.comparator(p_pos, p_steps, pos, steps)
 
                 if p_pos is not None:
@@ -169,44 +171,79 @@ class Braiding:
                     if p_pos==pos:
                         # p_score = score
                         p_steps = steps
-                        f_nw = i_nw
                         self.compiler.positions = copy.copy(positions_temp)
-
-            return f_nw, pos_end
+            return pos_end
         except exception.InvalidNanowireStateException:
             raise
 
-    def code_block_path(self, pos_start, pos_end, par, f_nw, utility, voltages, pair,
-            file_mvmt, file_state, pos_update, f_nw_update, update_zm, update_volt):
+    def code_block_path(self, pos_start, pos_end, par, utility, voltages, pair,
+            file_mvmt, file_state, pos_update, update_zm, update_volt):
         """Dijkstra's algorithm gives the shortest path for a particle"""
-        path = graph.route(self.nanowire.matrix,
-                self.nanowire.vertices.index(pos_start),
-                self.nanowire.vertices.index(pos_end))
-        block = validation.validate_path_particle(path,
-                self.compiler.positions, self.nanowire.vertices, par)
+        if self.constrained:
+            self.code_block_constrained_path(pos_start, pos_end, par, utility, voltages, pair,
+                file_mvmt, file_state, pos_update, update_zm, update_volt)
+            return
+        path = self.nanowire.get_path(pos_start, pos_end)
+        try:
+            block = validation.validate_path_particle(path,
+                    self.compiler.positions, self.nanowire.vertices, par)
+        except exception.PathBlockedException:
+            path = self.code_block_alternative_path(pos_start, pos_end, par)
+            if path is None:
+                raise
+            block = []
         if len(block)==0:
             if pos_update:
                 self.compiler.positions[par-1] = pos_end
-            self.code_block_update_states(f_nw_update, utility, update_zm, update_volt)
+            self.code_block_update_states(utility, update_zm, update_volt)
             Braiding.code_block_save_path_output(self.nanowire, voltages,
                 self.compiler.positions, pair, par, path, file_mvmt, file_state)
 
-    def code_block_update_states(self, f_nw, utility, update_zm, update_volt):
-        """Updates the necessary states after a braiding op"""
-        if f_nw is None:
-            f_nw = Utility.update_nanowire(self.nanowire.nanowire, self.compiler.positions)
-        self.nanowire.nanowire = copy.deepcopy(f_nw)
+    def code_block_alternative_path(self, pos_start, pos_end, par):
+        """The next shortest path which isn't blocked by another particle (None if there is none)"""
+        k = 0
+        path = self.nanowire.get_alternative_path(pos_start, pos_end, k)
+        while path is not None:
+            try:
+                block = validation.validate_path_particle(path,
+                        self.compiler.positions, self.nanowire.vertices, par)
+                if len(block)==0:
+                    return path
+            except exception.PathBlockedException:
+                pass
+            k += 1
+            path = self.nanowire.get_alternative_path(pos_start, pos_end, k)
+        return None
+
+    def code_block_constrained_path(self, pos_start, pos_end, par, utility, voltages, pair,
+            file_mvmt, file_state, pos_update, update_zm, update_volt):
+        """Constrained routing: the states (and voltages) of the move are updated first,
+        then the search only returns a path which isn't blocked by the other particles
+        or the shut voltage gates, else raises PathBlockedException"""
+        if pos_update:
+            self.compiler.positions[par-1] = pos_end
+        self.code_block_update_states(utility, update_zm, update_volt)
+        occupied = [self.compiler.positions[i] for i in range(len(self.compiler.positions))
+                    if i != par-1]
+        path = self.nanowire.get_constrained_path(pos_start, pos_end, occupied, voltages, par)
+        Braiding.code_block_save_path_output(self.nanowire, voltages,
+            self.compiler.positions, pair, par, path, file_mvmt, file_state)
+
+    def code_block_update_states(self, utility, update_zm, update_volt):
+        """Updates the necessary states after a braiding op
+        (the positions are applied to the Nanowire state in place, as a delta,
+        which also moves the particles of its zero mode tracker)"""
+        self.nanowire.apply_positions(self.compiler.positions)
         if update_zm:
-            utility.update_zero_modes(f_nw)
+            utility.update_zero_modes(self.nanowire.zero_modes)
         if update_volt:
-            utility.update_voltages(self.compiler.positions, self.nanowire.cutoff_pairs_adj)
+            utility.update_voltages(self.compiler.positions, self.nanowire.get_voltage_cutoffs())
 
     @classmethod
     def code_block_save_path_output(cls, nanowire_obj, voltages, positions,
             pair, par, path, file_mvmt, file_state):
         """Function calls to metrics """
-        if validation.validate_path_gates(par, path, nanowire_obj.vertices,
-                voltages, nanowire_obj.cutoff_pairs_adj, nanowire_obj.cutoff_pairs_opp):
+        if validation.validate_path_gates(par, path, nanowire_obj, voltages):
             metrics.update_particle_movements(file_mvmt, pair, par, path,
                 nanowire_obj.vertices, voltages)
             metrics.update_nanowire_state(file_state, pair,
@@ -248,18 +285,12 @@ class Braiding:
                 print("\033[0;33m----- Moving particles {} -----\033[0m".format(pair))
                 pair = (0,0)
                 # 1. Move initial inner to target outer position
-                positions_temp = copy.copy(self.compiler.positions)
-                positions_temp[par_inner-1] = final_positions[par_inner-1]
-                f_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
                 self.code_block_path(self.compiler.positions[par_inner-1], final_positions[par_inner-1], par_inner,
-                    f_nw, utility, utility.voltages, pair, file_mvmt, file_state, True, f_nw, False, False)
+                    utility, utility.voltages, pair, file_mvmt, file_state, True, False, False)
 
                 # 2. Move initial outer to target inner position
-                positions_temp = copy.copy(self.compiler.positions)
-                positions_temp[par_outer-1] = final_positions[par_outer-1]
-                f_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
                 self.code_block_path(self.compiler.positions[par_outer-1], final_positions[par_outer-1], par_outer,
-                    f_nw, utility, utility.voltages, pair, file_mvmt, file_state, True, f_nw, True, True)
+                    utility, utility.voltages, pair, file_mvmt, file_state, True, True, True)
 
             # Same order
             if dir == 1:
@@ -267,7 +298,7 @@ class Braiding:
                 pair_ret = pair
                 pair = (0,0)
                 # a. getting the intermediate positions for par_inner
-                inter_positions = Utility.get_intermediate_positions(self.nanowire.nanowire, self.compiler.positions[par_inner-1])
+                inter_positions = self.nanowire.get_intermediate_positions(self.compiler.positions[par_inner-1])
                 middle = ['m']
                 pos_mid2 = None
                 for position in inter_positions:
@@ -287,25 +318,16 @@ class Braiding:
                     raise exception.InvalidMovementException(msg)
 
                 # 1. Move par_inner to pos_mid2
-                positions_temp = copy.copy(self.compiler.positions)
-                positions_temp[par_inner-1] = pos_mid2
-                f_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
                 self.code_block_path(self.compiler.positions[par_inner-1], pos_mid2, par_inner,
-                    f_nw, utility, utility.voltages, pair, file_mvmt, file_state, True, f_nw, False, False)
+                    utility, utility.voltages, pair, file_mvmt, file_state, True, False, False)
 
                 # 2. Move the par_outer to outer position on target branch
-                positions_temp = copy.copy(self.compiler.positions)
-                positions_temp[par_outer-1] = final_positions[par_outer-1]
-                f_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
                 self.code_block_path(self.compiler.positions[par_outer-1], final_positions[par_outer-1], par_outer,
-                    f_nw, utility, utility.voltages, pair, file_mvmt, file_state, True, f_nw, False, False)
+                    utility, utility.voltages, pair, file_mvmt, file_state, True, False, False)
 
                 # 3. Move par_inner from pos_mid2 to inner position on target branch
-                positions_temp = copy.copy(self.compiler.positions)
-                positions_temp[par_inner-1] = final_positions[par_inner-1]
-                f_nw = Utility.update_nanowire(self.nanowire.nanowire, positions_temp)
-                self.code_block_path(pos_mid2, final_positions[par_inner-1], par_inner, f_nw,
-                    utility, utility.voltages, pair, file_mvmt, file_state, True, f_nw, True, True)
+                self.code_block_path(pos_mid2, final_positions[par_inner-1], par_inner,
+                    utility, utility.voltages, pair, file_mvmt, file_state, True, True, True)
 
             if self.compiler.positions == final_positions:
                 return final_positions, pair_ret
@@ -364,12 +386,12 @@ class Braiding:
         try:
             tup_cur1 = self.nanowire.nanowire[inter_initial][b1%n_branches][-1]
             pos_cur1 = list(tup_cur1.keys())[0]
-            free_positions1 = Utility.get_intermediate_positions(self.nanowire.nanowire, pos_cur1)
+            free_positions1 = self.nanowire.get_intermediate_positions(pos_cur1)
             free_branches1 = int(len(free_positions1)/2)+1
 
             tup_cur2 = self.nanowire.nanowire[inter_target][b2%n_branches][-1]
             pos_cur2 = list(tup_cur2.keys())[0]
-            free_positions2 = Utility.get_intermediate_positions(self.nanowire.nanowire, pos_cur2)
+            free_positions2 = self.nanowire.get_intermediate_positions(pos_cur2)
             free_branches2 = int(len(free_positions2)/2)+1
 
             if "opposite" in branch_cfg:
@@ -489,9 +511,8 @@ class Braiding:
             # 1a. validating final positions before moving forward with the braiding operation
             msg = "Error while trying to move {}: {} is an invalid state"\
                 .format((par1, par2), final_positions)
-            f_nw = Utility.update_nanowire(self.nanowire.nanowire, final_positions)
             positions_single = utility.get_isolated_particles(final_positions)
-            validation.validate_nanowire_state(f_nw, final_positions, utility,
+            validation.validate_nanowire_state(None, final_positions, utility,
                 positions_single, utility.voltages, self.nanowire, Braiding.TYPE_FINAL, msg)
 
             # 2. getting order (dir) of movement
@@ -544,9 +565,9 @@ class Braiding1Qubit(Braiding):
         file_mvmt = args[2]
         file_state = args[3]
         try:
-            utility.update_zero_modes(self.nanowire.nanowire)
+            utility.update_zero_modes(self.nanowire.zero_modes)
             voltages = utility.voltages
-            f_nw, final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
+            final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
 
             # 1.
             for par in pair:
@@ -554,24 +575,24 @@ class Braiding1Qubit(Braiding):
                 positions_temp = copy.copy(self.compiler.positions)
 
                 # getting the list of positions on free branches
-                inter_positions = Utility.get_intermediate_positions(self.nanowire.nanowire, pos_start)
+                inter_positions = self.nanowire.get_intermediate_positions(pos_start)
                 if dir is 1:
                     inter_positions = list(reversed(inter_positions))
 
-                f_nw, pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
+                pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
                     pair, par, voltages, utility, pos_start)
 
-                if pos_end is not None and f_nw is not None:
-                    self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                        pair, file_mvmt, file_state, False, f_nw, True, True)
+                if pos_end is not None:
+                    self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                        pair, file_mvmt, file_state, False, True, True)
 
             # 2.
             p_pair = pair
             for par in p_pair:
                 pos_start = self.compiler.positions[par-1]
                 pos_end = final_positions[par-1]
-                self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                    pair, file_mvmt, file_state, True, None, True, True)
+                self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                    pair, file_mvmt, file_state, True, True, True)
 
         except exception.NoEmptyPositionException:
             raise
@@ -600,10 +621,10 @@ class BraidingCNOT(Braiding2Qubits):
         file_state = args[3]
         try:
             particles = self.get_particles_list(pair)
-            utility.update_zero_modes(self.nanowire.nanowire)
+            utility.update_zero_modes(self.nanowire.zero_modes)
             voltages = utility.voltages
             pair0 = copy.copy(pair)
-            f_nw, final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
+            final_positions, positions_single = self.code_block_validation(pair, voltages, utility)
 
             # 1.
             pair2 = particles[:2]
@@ -612,32 +633,32 @@ class BraidingCNOT(Braiding2Qubits):
                 positions_temp = copy.copy(self.compiler.positions)
 
                 # getting the list of positions on free branches
-                inter_positions = Utility.get_intermediate_positions(self.nanowire.nanowire, pos_start)
+                inter_positions = self.nanowire.get_intermediate_positions(pos_start)
                 if dir is 1:
                     inter_positions = list(reversed(inter_positions))
 
-                f_nw, pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
+                pos_end = self.code_block_inter_positions(inter_positions, positions_temp,
                     pair, par, voltages, utility, pos_start)
 
-                if pos_end is not None and f_nw is not None:
-                    self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                        pair0, file_mvmt, file_state, False, f_nw, True, True)
+                if pos_end is not None:
+                    self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                        pair0, file_mvmt, file_state, False, True, True)
 
             # 2.
             par = particles[2]
             pos_start = self.compiler.positions[pair[1]-1]
             pos_end = final_positions[pair[1]-1]
             self.compiler.positions[par-1] = final_positions[par-1]
-            self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                pair0, file_mvmt, file_state, False, None, True, True)
+            self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                pair0, file_mvmt, file_state, False, True, True)
 
             # 3.
             p_pair = pair2
             for par in p_pair:
                 pos_start = self.compiler.positions[par-1]
                 pos_end = final_positions[par-1]
-                self.code_block_path(pos_start, pos_end, par, f_nw, utility, voltages,
-                    pair0, file_mvmt, file_state, True, None, True, True)
+                self.code_block_path(pos_start, pos_end, par, utility, voltages,
+                    pair0, file_mvmt, file_state, True, True, True)
 
         except exception.NoEmptyPositionException:
             raise
@@ -656,13 +677,13 @@ class BraidingCNOT(Braiding2Qubits):
         particles = []
         if self.compiler.positions[pair[0]-1] in self.nanowire.inner:
             particles.append(pair[0])
-            inter = Utility.get_intersection(self.nanowire.nanowire, self.compiler.positions[pair[1]-1])
+            inter = self.nanowire.get_intersection(self.compiler.positions[pair[1]-1])
             op = Utility.get_other_particle(pair[1], inter)
             particles.append(op)
             particles.append(pair[1])
         elif self.compiler.positions[pair[1]-1] in self.nanowire.inner:
             particles.append(pair[1])
-            inter = Utility.get_intersection(self.nanowire.nanowire, self.compiler.positions[pair[0]-1])
+            inter = self.nanowire.get_intersection(self.compiler.positions[pair[0]-1])
             op = Utility.get_other_particle(pair[1], inter)
             particles.append(op)
             particles.append(pair[0])
@@ -0,0 +1,196 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Connectivity
+
+Objectives:
+    1. Dynamic connectivity of the Nanowire under the voltage gates
+    2. The branches of an intersection are grouped by its open gates, and
+       every branch has a component label - a toggled gate relabels only
+       the components around its own intersection
+    3. Reachability queries in constant time - the component check of the constrained
+       routing mode (only built for `routing: constrained`), no distances are kept
+
+Class: Connectivity
+
+Methods:
+    1. initiate_cutoffs
+    2. initiate_labels
+    3. update_voltages
+    4. set_gate
+    5. get_groups
+    6. merge_labels
+    7. split_labels
+    8. is_reachable
+"""
+
+class Connectivity:
+    """
+    Component labels of the Nanowire branches under the current voltage gates
+    """
+
+    VOLTAGE_SHUT = 'S'
+    VOLTAGE_OPEN = 'O'
+
+    def __init__(self, nanowire_obj):
+        self.branches = []
+        self.branch_of = {}
+        self.arms = []
+        self.arm_of = []
+        self.memberships = []
+        self.gates = []
+        self.cuts_adj = []
+        self.cuts_opp = []
+        self.voltages = []
+        self.groups = []
+        self.labels = []
+        self.members = {}
+        self.count = 0
+
+        # branches, by their positions (shared branches are the same branch)
+        for intersection in nanowire_obj.nanowire:
+            arms = []
+            arm_of = {}
+            for branch in intersection:
+                cb = tuple(list(tup.keys())[0] for tup in branch if isinstance(tup, dict))
+                if cb[0] not in self.branch_of:
+                    self.branch_of.update((pos, len(self.branches)) for pos in cb)
+                    self.branches.append(cb)
+                    self.memberships.append([])
+                b = self.branch_of[cb[0]]
+                self.memberships[b].append((len(self.arms), len(arms)))
+                arm_of.update((pos, len(arms)) for pos in cb)
+                arms.append(b)
+            self.arms.append(arms)
+            self.arm_of.append(arm_of)
+            self.gates.append([])
+
+        self.initiate_cutoffs(nanowire_obj.cutoff_pairs_adj, nanowire_obj.cutoff_pairs_opp)
+        self.groups = [self.get_groups(k) for k in range(len(self.arms))]
+        self.initiate_labels()
+
+    def initiate_cutoffs(self, cutoff_pairs_adj, cutoff_pairs_opp):
+        """
+        The (arm) branch pairs cut by every voltage gate, i -> intersection i//2
+        """
+        for i in range(len(cutoff_pairs_adj)):
+            k = i//2
+            arm_of = self.arm_of[k]
+            adj = set(frozenset((arm_of[p], arm_of[q])) for p, q in cutoff_pairs_adj[i])
+            opp = set(frozenset((arm_of[p], arm_of[q])) for p, q in cutoff_pairs_opp[i])
+            self.cuts_adj.append(adj)
+            self.cuts_opp.append(opp)
+            self.gates[k].append(i)
+            self.voltages.append(Connectivity.VOLTAGE_OPEN)
+
+    def initiate_labels(self):
+        """
+        Label the components of the branch graph
+        """
+        self.labels = [-1]*len(self.branches)
+        self.members = {}
+        for b in range(len(self.branches)):
+            if self.labels[b] == -1:
+                self.split_labels([b])
+
+    def update_voltages(self, voltages):
+        """
+        Apply the voltages (list of 'O'/'S'), only the toggled gates are updated
+        """
+        for i in range(len(self.voltages)):
+            if voltages[i] != self.voltages[i]:
+                self.set_gate(i, voltages[i])
+
+    def set_gate(self, i, state):
+        """
+        Toggle the voltage gate i, and relabel the components of its intersection
+        """
+        k = i//2
+        if self.voltages[i] == state:
+            return
+        self.voltages[i] = state
+        old = self.groups[k]
+        self.groups[k] = self.get_groups(k)
+
+        # opening a gate only merges the groups (and components)
+        if state == Connectivity.VOLTAGE_OPEN:
+            for group in self.groups[k]:
+                self.merge_labels([self.arms[k][a] for a in group])
+        elif old != self.groups[k]:
+            labels = set(self.labels[b] for b in self.arms[k])
+            branches = []
+            for label in labels:
+                branches.extend(self.members.pop(label))
+            for b in branches:
+                self.labels[b] = -1
+            for b in branches:
+                if self.labels[b] == -1:
+                    self.split_labels([b])
+
+    def get_groups(self, k):
+        """
+        The arms of the intersection k, grouped by the pairs not cut by a shut gate
+        """
+        n = len(self.arms[k])
+        cuts = set()
+        for i in self.gates[k]:
+            if self.voltages[i] == Connectivity.VOLTAGE_SHUT:
+                cuts |= self.cuts_adj[i] | self.cuts_opp[i]
+        group = list(range(n))
+        for a in range(n):
+            for b in range(a+1, n):
+                if frozenset((a, b)) not in cuts and group[a] != group[b]:
+                    old = group[b]
+                    group = [group[a] if g == old else g for g in group]
+        groups = {}
+        for a in range(n):
+            groups.setdefault(group[a], []).append(a)
+        return sorted(groups.values())
+
+    def merge_labels(self, branches):
+        """
+        Merge the components of the branches, the smaller ones are relabelled
+        """
+        labels = set(self.labels[b] for b in branches)
+        if len(labels) < 2:
+            return
+        label = max(labels, key=lambda l: len(self.members[l]))
+        for other in labels:
+            if other == label:
+                continue
+            for b in self.members.pop(other):
+                self.labels[b] = label
+                self.members[label].append(b)
+
+    def split_labels(self, stack):
+        """
+        Label (anew) the component reachable from the branches in the stack
+        """
+        label = self.count
+        self.count += 1
+        self.members[label] = []
+        for b in stack:
+            self.labels[b] = label
+        while stack:
+            b = stack.pop()
+            self.members[label].append(b)
+            for k, a in self.memberships[b]:
+                for group in self.groups[k]:
+                    if a not in group:
+                        continue
+                    for g in group:
+                        other = self.arms[k][g]
+                        if self.labels[other] == -1:
+                            self.labels[other] = label
+                            stack.append(other)
+
+    def is_reachable(self, pos1, pos2):
+        """
+        Is pos2 reachable from pos1 under the current voltage gates
+        """
+        if pos1 not in self.branch_of or pos2 not in self.branch_of:
+            return True
+        return self.labels[self.branch_of[pos1]] == self.labels[self.branch_of[pos2]]
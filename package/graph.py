@@ -7,21 +7,66 @@ License:
 Module: Graph
 
 Objectives:
-    1. Extracts the Adjacency matrix
+    1. Extracts the Adjacency matrix (dense, a sparse edge list, or a memory-mapped binary)
     2. Calculates the shortest path using Dijkstra's algorithm
+    3. Compiles the Adjacency matrix into an immutable adjacency-list graph
+    4. All-pairs shortest path oracle (distance and next-hop matrices)
+    5. Constrained routing around blocked vertices and shut turns
+    6. Single-pass multi-target distance queries
+    7. A* routing with the (physical) coordinates of the positions
+    8. Ranked alternative (k-shortest simple) paths, cached per pair
+
+Class:
+    1. Graph
+    2. Oracle
+    3. Routes
 
 Functions:
     1. adjacency_matrix
-    2. validate_matrix
-    3. transform_matrix
-    4. min_distance
-    5. get_path
-    6. dijkstra
-    7. route
+    2. adjacency_edges
+    3. is_adjacency_edges
+    4. is_adjacency_binary
+    5. save_matrix
+    6. load_matrix
+    7. convert_matrix
+    8. edges_to_matrix
+    9. validate_matrix
+
+    10. matrix_bandwidth
+    11. compile_matrix
+    12. compile_array
+    13. compile_edges
+    14. build_path
+    15. bfs_tree
+    16. bfs
+    17. dijkstra_tree
+    18. dijkstra_heap
+    19. shortest_path
+    20. constrained_path
+    21. distances
+    22. heuristic_scale
+    23. astar_tree
+    24. astar
+
+    25. all_pairs
+    26. graph_checksum
+    27. save_oracle
+    28. load_oracle
+
+    29. spur_path
+    30. path_cost
+    31. k_shortest_paths
 """
 
+import os
+import hashlib
+import heapq
+import math
 import numpy as np
 
+EDGES_HEADER = "Node1,Node2,Weight"
+BINARY_MAGIC = b'\x93NUMPY'
+
 ################################################################################
 def adjacency_matrix(file):
     """
@@ -46,91 +91,607 @@ def adjacency_matrix(file):
     except IOError:
         raise
 
+def adjacency_edges(file):
+    """
+    Extracts the (sparse) Adjacency edge list [(u, v, w)] from the given file
+    """
+    edges = []
+    try:
+        with open(file, 'r') as fr:
+            fr.readline()
+            for line in fr:
+                row = line.split(',')
+                if len(row) < 3:
+                    continue
+                edges.append((int(row[0]), int(row[1]), int(row[2])))
+        return edges
+    except IOError:
+        raise
+
+def is_adjacency_edges(file):
+    """
+    Checks if the given file is an Adjacency edge list (or a dense matrix)
+    """
+    try:
+        with open(file, 'r') as fr:
+            return fr.readline().strip() == EDGES_HEADER
+    except IOError:
+        raise
+
+def is_adjacency_binary(file):
+    """
+    Checks if the given file is a binary (.npy) Adjacency matrix
+    """
+    try:
+        with open(file, 'rb') as fr:
+            return fr.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except IOError:
+        raise
+
+def save_matrix(file, matrix):
+    """
+    Saves the Adjacency matrix into the given file as a binary (.npy, int8) matrix
+    """
+    m = np.asarray(matrix)
+    if m.size > 0 and (m.min() < np.iinfo(np.int8).min or m.max() > np.iinfo(np.int8).max):
+        raise SyntaxError('Invalid adjacency matrix')
+    try:
+        with open(file, 'wb') as fw:
+            np.save(fw, m.astype(np.int8))
+    except IOError:
+        raise
+
+def load_matrix(file):
+    """
+    Opens the binary Adjacency matrix of the given file, memory-mapped (read-only)
+    """
+    try:
+        return np.load(file, mmap_mode='r')
+    except IOError:
+        raise
+
+def convert_matrix(file, file_binary, n=None):
+    """
+    Converts the Adjacency matrix (dense) or edge list (of n vertices) of the given
+    CSV file into a binary matrix
+    """
+    try:
+        if is_adjacency_edges(file):
+            edges = adjacency_edges(file)
+            if n is None:
+                n = max([max(u, v) for u, v, _ in edges] + [-1])+1
+            matrix = edges_to_matrix(edges, n)
+        else:
+            matrix = adjacency_matrix(file)
+        save_matrix(file_binary, matrix)
+    except IOError:
+        raise
+
+def edges_to_matrix(edges, n):
+    """
+    The dense (int8) Adjacency matrix of the edge list of n vertices
+    (as nanowire.construct_adj_matrix - the linked vertices have self-links)
+    """
+    matrix = np.zeros((n, n), dtype=np.int8)
+    for u, v, w in edges:
+        matrix[u][u] = matrix[v][v] = w
+        matrix[u][v] = matrix[v][u] = w
+    return matrix
+
 def validate_matrix(matrix):
     """
-    Validates the given Adjacency matrix
+    Validates the given Adjacency matrix - square, and symmetric on its nonzero
+    entries (without a transposed copy of a memory-mapped matrix)
     """
-    m = np.array(matrix)
-    mT = m.transpose()
-    if (m == mT).all() and (all (len(row) == len(m) for row in m)):
+    m = np.asarray(matrix)
+    if m.size == 0:
         return True
+    if m.ndim == 2 and m.shape[0] == m.shape[1]:
+        rows, cols = np.nonzero(m)
+        if (m[rows, cols] == m[cols, rows]).all():
+            return True
     raise SyntaxError('Invalid adjacency matrix')
 
-def transform_matrix(matrix):
+################################################################################
+class Graph:
+    """
+    An immutable adjacency-list (CSR) form of the Nanowire adjacency matrix,
+    compiled once and shared by every routing query
+    """
+
+    def __init__(self, offsets, targets, weights, vertices=None):
+        self.offsets = tuple(offsets)
+        self.targets = tuple(targets)
+        self.weights = tuple(weights)
+        self.neighbours = tuple(self.targets[self.offsets[u]:self.offsets[u+1]]
+                                for u in range(len(self.offsets)-1))
+        self.costs = tuple(self.weights[self.offsets[u]:self.offsets[u+1]]
+                           for u in range(len(self.offsets)-1))
+        self.unit = all(w == 1 for w in self.weights)
+        self.vertices = tuple(vertices) if vertices is not None else None
+        self.index = None
+        if vertices is not None:
+            self.index = {v: i for i, v in enumerate(self.vertices)}
+
+    def __len__(self):
+        return len(self.neighbours)
+
+def matrix_bandwidth(matrix):
     """
-    Transforms the given matrix
+    Bandwidth of the Adjacency matrix (or compiled Graph) - the max |u-v| of its edges
     """
-    for row in matrix:
-        for i in range(len(row)):
-            if row[i] == 0:
-                row[i]=float("Inf")
-    return matrix
+    band = 0
+    if isinstance(matrix, Graph):
+        for u in range(len(matrix)):
+            for v in matrix.neighbours[u]:
+                band = max(band, abs(u-v))
+        return band
+    for u in range(len(matrix)):
+        for v in range(len(matrix[u])):
+            if u != v and 0 < matrix[u][v] < float("Inf"):
+                band = max(band, abs(u-v))
+    return band
 
-################################################################################
-def min_distance(dist, blackened):
+def compile_matrix(matrix, vertices=None):
     """
-    Checks if dist is min distance
+    Compiles the Adjacency matrix into an immutable Graph
+    (self-loops, 0 and Inf entries are not edges)
     """
-    min = float("Inf")
-    for v in range(len(dist)):
-        if not blackened[v] and dist[v] < min:
-            min = dist[v]
-            min_index = v
-    return float("Inf") if min == float("Inf") else min_index
+    if isinstance(matrix, np.ndarray):
+        return compile_array(matrix, vertices)
+    offsets = [0]
+    targets = []
+    weights = []
+    for u, row in enumerate(matrix):
+        for v, w in enumerate(row):
+            if u != v and 0 < w < float("Inf"):
+                targets.append(v)
+                weights.append(w)
+        offsets.append(len(targets))
+    return Graph(offsets, targets, weights, vertices)
 
-def get_path(matrix, parent, _d, path):
+def compile_array(matrix, vertices=None):
     """
-    Get path from parent
+    compile_matrix of a NumPy (or memory-mapped) matrix, a row at a time
     """
-    if parent[_d] == -1:
-        path.append(_d)
-        return
-    get_path(matrix, parent, parent[_d], path)
-    path.append(_d)
-
-def dijkstra(graph, _s, _d):
-    """
-    Dijkstra's algorithm to extract shortest path
-    """
-    row = len(graph)
-    dist = [float("Inf")] * row
-    blackened =[0] * row
-    pathlength =[0] * row
-    parent = [-1] * row
-    dist[_s]= 0
-    for _ in range(row-1):
-        u = min_distance(dist, blackened)
-        if u == float("Inf"):
+    offsets = [0]
+    targets = []
+    weights = []
+    for u in range(len(matrix)):
+        row = np.asarray(matrix[u])
+        ids = np.flatnonzero((row > 0) & (row < np.inf))
+        ids = ids[ids != u]
+        targets.extend(ids.tolist())
+        weights.extend(row[ids].tolist())
+        offsets.append(len(targets))
+    return Graph(offsets, targets, weights, vertices)
+
+def compile_edges(edges, n, vertices=None):
+    """
+    Compiles the (undirected) Adjacency edge list of n vertices into an immutable
+    Graph in O(V+E), the same Graph as compile_matrix of its dense matrix
+    """
+    adjacency = [dict() for _ in range(n)]
+    for u, v, w in edges:
+        if u != v and 0 < w < float("Inf"):
+            adjacency[u][v] = w
+            adjacency[v][u] = w
+    offsets = [0]
+    targets = []
+    weights = []
+    for u in range(n):
+        for v in sorted(adjacency[u]):
+            targets.append(v)
+            weights.append(adjacency[u][v])
+        offsets.append(len(targets))
+    return Graph(offsets, targets, weights, vertices)
+
+def build_path(parent, _d):
+    """
+    Get path from parent (iterative)
+    """
+    path = [_d]
+    while parent[path[-1]] != -1:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+def bfs_tree(network, _s, _d=None):
+    """
+    Level-synchronous BFS for unit weights, expanding every level in vertex order
+    so the parents are the same as the ones given by dijkstra.
+    Returns the (parent, pathlength) lists, stopping once _d is reached
+    """
+    parent = [-1] * len(network)
+    pathlength = [-1] * len(network)
+    pathlength[_s] = 0
+    level = [_s]
+    steps = 0
+    while level and (_d is None or pathlength[_d] == -1):
+        steps += 1
+        following = []
+        for u in level:
+            for v in network.neighbours[u]:
+                if pathlength[v] == -1:
+                    pathlength[v] = steps
+                    parent[v] = u
+                    following.append(v)
+        following.sort()
+        level = following
+    return parent, pathlength
+
+def bfs(network, _s, _d):
+    """
+    BFS shortest path parents for unit weights
+    """
+    parent, pathlength = bfs_tree(network, _s, _d)
+    if pathlength[_d] != -1:
+        return parent
+    raise StopIteration("No known path between {} and {}".format(_s, _d))
+
+def dijkstra_tree(network, _s, _d=None):
+    """
+    Binary-heap Dijkstra's algorithm, ties are settled in vertex order.
+    Returns the (parent, pathlength) lists, stopping once _d is settled
+    """
+    n = len(network)
+    dist = [float("Inf")] * n
+    blackened = [0] * n
+    pathlength = [-1] * n
+    parent = [-1] * n
+    dist[_s] = 0
+    pathlength[_s] = 0
+    heap = [(0, _s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if blackened[u]:
+            continue
+        blackened[u] = 1
+        if u == _d:
             break
-        blackened[u]= 1
-        for v in range(row):
-            if blackened[v] == 0 and graph[u][v] and dist[u]+graph[u][v]<dist[v]:
-                parent[v]= u
-                pathlength[v]= pathlength[parent[v]]+1
-                dist[v]= dist[u]+graph[u][v]
-            elif blackened[v] == 0 and graph[u][v] and\
-                dist[u]+graph[u][v] == dist[v] and pathlength[u] + 1 < pathlength[v]:
-                parent[v]= u
-                pathlength[v] = pathlength[u] + 1
-
-    if dist[_d]!= float("Inf"):
+        for v, w in zip(network.neighbours[u], network.costs[u]):
+            if blackened[v]:
+                continue
+            if d+w < dist[v]:
+                parent[v] = u
+                pathlength[v] = pathlength[u]+1
+                dist[v] = d+w
+                heapq.heappush(heap, (dist[v], v))
+            elif d+w == dist[v] and pathlength[u]+1 < pathlength[v]:
+                parent[v] = u
+                pathlength[v] = pathlength[u]+1
+    return parent, pathlength
+
+def dijkstra_heap(network, _s, _d):
+    """
+    Binary-heap Dijkstra's shortest path parents
+    """
+    parent, pathlength = dijkstra_tree(network, _s, _d)
+    if pathlength[_d] != -1:
         return parent
     raise StopIteration("No known path between {} and {}".format(_s, _d))
 
-def route(matrix, start, end):
+def shortest_path(network, start, end):
     """
-    Validates matrix, and returns shortest path from start to end
+    Returns shortest path from start to end on the compiled graph
     """
     try:
-        validate_matrix(matrix)
-        matrix = transform_matrix(matrix)
+        if network.unit:
+            parent = bfs(network, start, end)
+        else:
+            parent = dijkstra_heap(network, start, end)
+        return build_path(parent, end)
+    except StopIteration as err:
+        print(err)
 
-        path = []
-        parent = dijkstra(matrix, start, end)
-        get_path(matrix, parent, end, path)
+def constrained_path(network, start, end, blocked=(), shut=()):
+    """
+    Shortest path from start to end which doesn't enter a blocked vertex (except end)
+    nor take a shut turn - {u, w} through a vertex u-v-w, None if there is none.
+    The search is over (vertex, previous vertex) states, ties settled in vertex order
+    """
+    if start == end:
+        return [start]
+    dist = {(start, -1): 0}
+    parent = {(start, -1): None}
+    settled = set()
+    heap = [(0, start, -1)]
+    while heap:
+        d, v, prev = heapq.heappop(heap)
+        if (v, prev) in settled:
+            continue
+        settled.add((v, prev))
+        if v == end:
+            path = []
+            state = (v, prev)
+            while state is not None:
+                path.append(state[0])
+                state = parent[state]
+            path.reverse()
+            return path
+        for w, c in zip(network.neighbours[v], network.costs[v]):
+            if w == prev or (w != end and w in blocked):
+                continue
+            if prev != -1 and frozenset((prev, w)) in shut:
+                continue
+            state = (w, v)
+            if d+c < dist.get(state, float("Inf")):
+                dist[state] = d+c
+                parent[state] = (v, prev)
+                heapq.heappush(heap, (d+c, w, v))
+    return None
 
+def distances(network, source, targets, nearest=False):
+    """
+    One search from source for the # steps to every target (Inf if not reached).
+    With nearest, the search stops once the level of the nearest target is settled
+    """
+    remaining = set(targets)
+    steps = dict((t, float("Inf")) for t in remaining)
+    if not network.unit:
+        _, pathlength = dijkstra_tree(network, source)
+        for t in remaining:
+            if pathlength[t] != -1:
+                steps[t] = pathlength[t]
+        return steps
+
+    seen = [False] * len(network)
+    seen[source] = True
+    level = [source]
+    d = 0
+    while level and remaining:
+        for u in level:
+            if u in remaining:
+                steps[u] = d
+                remaining.discard(u)
+        if nearest and len(remaining) < len(steps):
+            break
+        following = []
+        for u in level:
+            for v in network.neighbours[u]:
+                if not seen[v]:
+                    seen[v] = True
+                    following.append(v)
+        level = following
+        d += 1
+    return steps
+
+def heuristic_scale(network, coordinates):
+    """
+    Scale of the Euclidean distance which keeps the A* heuristic admissible:
+    an edge can't cost less than its length times (min weight / max edge length)
+    """
+    longest = 0
+    for u in range(len(network)):
+        for v in network.neighbours[u]:
+            longest = max(longest, math.dist(coordinates[u], coordinates[v]))
+    if longest == 0 or len(network.weights) == 0:
+        return 0
+    return min(network.weights)/longest
+
+def astar_tree(network, _s, _d, coordinates, scale):
+    """
+    A* search guided by the Euclidean distance to _d, ties settled deepest first.
+    Returns the (parent, pathlength) lists and the # expanded vertices
+    """
+    n = len(network)
+    target = coordinates[_d]
+    dist = [float("Inf")] * n
+    blackened = [0] * n
+    pathlength = [-1] * n
+    parent = [-1] * n
+    dist[_s] = 0
+    pathlength[_s] = 0
+    expanded = 0
+    heap = [(0, 0, _s)]
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if blackened[u]:
+            continue
+        blackened[u] = 1
+        expanded += 1
+        if u == _d:
+            break
+        for v, w in zip(network.neighbours[u], network.costs[u]):
+            if blackened[v]:
+                continue
+            if dist[u]+w < dist[v]:
+                parent[v] = u
+                pathlength[v] = pathlength[u]+1
+                dist[v] = dist[u]+w
+                h = scale*math.dist(coordinates[v], target)
+                heapq.heappush(heap, (dist[v]+h, -dist[v], v))
+    return parent, pathlength, expanded
+
+def astar(network, _s, _d, coordinates, scale):
+    """
+    A* shortest path parents
+    """
+    parent, pathlength, _ = astar_tree(network, _s, _d, coordinates, scale)
+    if pathlength[_d] != -1:
+        return parent
+    raise StopIteration("No known path between {} and {}".format(_s, _d))
+
+################################################################################
+class Oracle:
+    """
+    All-pairs shortest path oracle of a compiled graph
+        steps[s][v] - # steps of the shortest path from s to v (-1 if unreachable)
+        hops[s][v]  - next hop from v towards s on that path (-1 at s)
+    """
+
+    def __init__(self, steps, hops, checksum=None):
+        self.steps = steps
+        self.hops = hops
+        self.checksum = checksum
+
+    def get_steps(self, start, end):
+        """
+        Returns # steps from start to end
+        """
+        return int(self.steps[start, end])
+
+    def get_distances(self, start, targets):
+        """
+        Returns # steps from start to every target (Inf if unreachable)
+        """
+        steps = self.steps[start]
+        return dict((t, int(steps[t]) if steps[t] != -1 else float("Inf")) for t in targets)
+
+    def get_path(self, start, end):
+        """
+        Returns the shortest path from start to end, O(path length)
+        """
+        if self.steps[start, end] == -1:
+            print("No known path between {} and {}".format(start, end))
+            return None
+        hops = self.hops[start]
+        path = [end]
+        while path[-1] != start:
+            path.append(int(hops[path[-1]]))
+        path.reverse()
         return path
-    except SyntaxError as err:
-        print(err)
-    except StopIteration as err:
-        print(err)
+
+def all_pairs(network, checksum=None):
+    """
+    Builds the all-pairs shortest path Oracle, one search per source vertex
+    """
+    n = len(network)
+    dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+    steps = np.full((n, n), -1, dtype=dtype)
+    hops = np.full((n, n), -1, dtype=dtype)
+    for _s in range(n):
+        if network.unit:
+            parent, pathlength = bfs_tree(network, _s)
+        else:
+            parent, pathlength = dijkstra_tree(network, _s)
+        steps[_s] = pathlength
+        hops[_s] = parent
+    return Oracle(steps, hops, checksum)
+
+def graph_checksum(network):
+    """
+    Checksum of the compiled graph and its vertices, to match a saved Oracle
+    """
+    sha = hashlib.sha1()
+    sha.update(np.asarray(network.offsets, dtype=np.int64).tobytes())
+    sha.update(np.asarray(network.targets, dtype=np.int64).tobytes())
+    sha.update(np.asarray(network.weights, dtype=np.float64).tobytes())
+    sha.update(','.join(network.vertices or ()).encode())
+    return sha.hexdigest()
+
+def save_oracle(file, oracle):
+    """
+    Saves the Oracle into the given (.npz) file
+    """
+    try:
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file, 'wb') as fw:
+            np.savez(fw, steps=oracle.steps, hops=oracle.hops,
+                     checksum=np.array(oracle.checksum or ''))
+    except IOError:
+        raise
+
+def load_oracle(file, checksum=None):
+    """
+    Loads the Oracle from the given file, None if it doesn't match the checksum
+    """
+    try:
+        with np.load(file) as data:
+            if checksum is not None and str(data['checksum']) != checksum:
+                return None
+            return Oracle(data['steps'], data['hops'], str(data['checksum']))
+    except IOError:
+        raise
+
+################################################################################
+class Routes:
+    """
+    The simple paths from start to end in cost order, generated lazily
+    (Yen's algorithm) and cached
+    """
+
+    def __init__(self, network, start, end):
+        self.paths = []
+        self.generator = k_shortest_paths(network, start, end)
+
+    def get_path(self, k):
+        """
+        Returns the kth shortest path (from 0), None if there are fewer paths
+        """
+        while len(self.paths) <= k and self.generator is not None:
+            try:
+                self.paths.append(next(self.generator))
+            except StopIteration:
+                self.generator = None
+        if k < len(self.paths):
+            return self.paths[k]
+        return None
+
+def spur_path(network, start, end, blocked=(), removed=()):
+    """
+    Shortest (cost, path) from start to end which doesn't enter a blocked vertex
+    nor take a removed (u, v) edge, None if there is none
+    """
+    dist = {start: 0}
+    parent = {start: -1}
+    settled = set()
+    heap = [(0, start)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u == end:
+            return d, build_path(parent, end)
+        for v, w in zip(network.neighbours[u], network.costs[u]):
+            if v in settled or v in blocked or (u, v) in removed:
+                continue
+            if d+w < dist.get(v, float("Inf")):
+                dist[v] = d+w
+                parent[v] = u
+                heapq.heappush(heap, (d+w, v))
+    return None
+
+def path_cost(network, path):
+    """
+    The cost (sum of the edge weights) of the path
+    """
+    cost = 0
+    for u, v in zip(path, path[1:]):
+        cost += network.costs[u][network.neighbours[u].index(v)]
+    return cost
+
+def k_shortest_paths(network, start, end):
+    """
+    Yen's algorithm - yields the simple paths from start to end in cost order
+    """
+    first = spur_path(network, start, end)
+    if first is None:
+        return
+    found = [first[1]]
+    seen = set([tuple(first[1])])
+    candidates = []
+    yield first[1]
+    while True:
+        path = found[-1]
+        for i in range(len(path)-1):
+            root = path[:i+1]
+            removed = set()
+            for p in found:
+                if p[:i+1] == root:
+                    removed.add((p[i], p[i+1]))
+            spur = spur_path(network, root[-1], end, set(root[:-1]), removed)
+            if spur is None:
+                continue
+            candidate = root + spur[1][1:]
+            if tuple(candidate) in seen:
+                continue
+            seen.add(tuple(candidate))
+            heapq.heappush(candidates, (path_cost(network, root)+spur[0], candidate))
+        if not candidates:
+            return
+        found.append(heapq.heappop(candidates)[1])
+        yield found[-1]
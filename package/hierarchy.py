@@ -0,0 +1,247 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Hierarchy
+
+Objectives:
+    1. Hierarchical (2-level) routing for Nanowires with many intersections
+    2. Local paths are precomputed within every intersection
+    3. The coarse graph of portals (shared branches between intersections)
+       is solved once, routes are stitched from the cached segments
+
+Class: Hierarchy
+
+Methods:
+    1. initiate_local_paths
+    2. initiate_portals
+    3. initiate_coarse_paths
+    4. get_route
+    5. get_steps
+    6. get_path
+    7. get_local_path
+
+Functions:
+    1. local_tree
+    2. intersection_clusters
+"""
+
+import heapq
+import numpy as np
+
+class Hierarchy:
+    """
+    A 2-level router: the intersections (clusters) of the Nanowire graph,
+    and a coarse graph over their portals
+    """
+
+    def __init__(self, network, clusters):
+        self.network = network
+        self.clusters = [frozenset(c) for c in clusters]
+        self.membership = [[] for _ in range(len(network))]
+        self.local = []
+        self.portals = []
+        self.portal_index = {}
+        self.portal_vertices = []
+        self.coarse_steps = None
+        self.coarse_hops = None
+        self.coarse_links = {}
+
+        # vertices outside every cluster are clusters of their own
+        for c in range(len(self.clusters)):
+            for v in self.clusters[c]:
+                self.membership[v].append(c)
+        for v in range(len(network)):
+            if not self.membership[v]:
+                self.membership[v].append(len(self.clusters))
+                self.clusters.append(frozenset([v]))
+
+        self.initiate_local_paths()
+        self.initiate_portals()
+        self.initiate_coarse_paths()
+
+    def initiate_local_paths(self):
+        """
+        Precompute the paths within every intersection (cluster)
+        """
+        for cluster in self.clusters:
+            trees = {}
+            for v in cluster:
+                trees[v] = local_tree(self.network, v, cluster)
+            self.local.append(trees)
+
+    def initiate_portals(self):
+        """
+        The portals of a cluster are its vertices shared with, or linked to, another cluster
+        """
+        for c in range(len(self.clusters)):
+            ports = []
+            for v in sorted(self.clusters[c]):
+                if len(self.membership[v]) > 1 or\
+                    any(c not in self.membership[w] for w in self.network.neighbours[v]):
+                    ports.append(v)
+            self.portals.append(ports)
+        for ports in self.portals:
+            for v in ports:
+                if v not in self.portal_index:
+                    self.portal_index[v] = len(self.portal_index)
+                    self.portal_vertices.append(v)
+
+    def initiate_coarse_paths(self):
+        """
+        All-pairs shortest paths over the coarse graph of portals
+        """
+        n = len(self.portal_index)
+        coarse = [dict() for _ in range(n)]
+        for c in range(len(self.clusters)):
+            for u in self.portals[c]:
+                steps = self.local[c][u][1]
+                for v in self.portals[c]:
+                    if u == v or v not in steps:
+                        continue
+                    i = self.portal_index[u]
+                    j = self.portal_index[v]
+                    if steps[v] < coarse[i].get(j, (float("Inf"),))[0]:
+                        coarse[i][j] = (steps[v], c)
+        for u in self.portal_index:
+            for v, w in zip(self.network.neighbours[u], self.network.costs[u]):
+                if v not in self.portal_index:
+                    continue
+                i = self.portal_index[u]
+                j = self.portal_index[v]
+                if w < coarse[i].get(j, (float("Inf"),))[0]:
+                    coarse[i][j] = (w, None)
+
+        self.coarse_steps = np.full((n, n), np.inf)
+        self.coarse_hops = np.full((n, n), -1, dtype=np.int32)
+        for i in range(n):
+            dist = self.coarse_steps[i]
+            dist[i] = 0
+            heap = [(0, i)]
+            done = set()
+            while heap:
+                d, u = heapq.heappop(heap)
+                if u in done:
+                    continue
+                done.add(u)
+                for v, (w, c) in coarse[u].items():
+                    if d+w < dist[v]:
+                        dist[v] = d+w
+                        self.coarse_hops[i][v] = u
+                        heapq.heappush(heap, (d+w, v))
+        for i in range(n):
+            for j, (_, c) in coarse[i].items():
+                self.coarse_links[(i, j)] = c
+
+    def get_route(self, start, end):
+        """
+        The best (cost, cluster of start, portal, portal, cluster of end) combination,
+        a constant # lookups for bounded portals per intersection
+        """
+        best = (float("Inf"), None, None, None, None)
+        for cs in self.membership[start]:
+            if end in self.clusters[cs]:
+                steps = self.local[cs][start][1].get(end, float("Inf"))
+                if steps < best[0]:
+                    best = (steps, cs, None, None, cs)
+            for ps in self.portals[cs]:
+                ls = self.local[cs][start][1].get(ps, float("Inf"))
+                row = self.coarse_steps[self.portal_index[ps]]
+                for cd in self.membership[end]:
+                    for pd in self.portals[cd]:
+                        ld = self.local[cd][pd][1].get(end, float("Inf"))
+                        cost = ls + row[self.portal_index[pd]] + ld
+                        if cost < best[0]:
+                            best = (cost, cs, ps, pd, cd)
+        return best
+
+    def get_steps(self, start, end):
+        """
+        # steps (cost) from start to end
+        """
+        return self.get_route(start, end)[0]
+
+    def get_path(self, start, end):
+        """
+        Shortest path from start to end, stitched from the cached local segments
+        """
+        cost, cs, ps, pd, cd = self.get_route(start, end)
+        if cost == float("Inf"):
+            print("No known path between {} and {}".format(start, end))
+            return None
+        if ps is None:
+            return self.get_local_path(cs, start, end)
+
+        # portals on the coarse path from ps to pd
+        i = self.portal_index[ps]
+        j = self.portal_index[pd]
+        coarse = [j]
+        while coarse[-1] != i:
+            coarse.append(int(self.coarse_hops[i][coarse[-1]]))
+        coarse.reverse()
+        portals = self.portal_vertices
+
+        path = self.get_local_path(cs, start, ps)
+        for k in range(len(coarse)-1):
+            c = self.coarse_links[(coarse[k], coarse[k+1])]
+            u = portals[coarse[k]]
+            v = portals[coarse[k+1]]
+            if c is None:
+                path.append(v)
+            else:
+                path.extend(self.get_local_path(c, u, v)[1:])
+        path.extend(self.get_local_path(cd, pd, end)[1:])
+        return path
+
+    def get_local_path(self, c, start, end):
+        """
+        The cached path within the cluster c
+        """
+        parent = self.local[c][start][0]
+        path = [end]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+def local_tree(network, source, cluster):
+    """
+    Shortest path (parent, steps) dicts from source, within the cluster only
+    """
+    parent = {source: -1}
+    steps = {source: 0}
+    heap = [(0, source)]
+    done = set()
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        for v, w in zip(network.neighbours[u], network.costs[u]):
+            if v in cluster and d+w < steps.get(v, float("Inf")):
+                steps[v] = d+w
+                parent[v] = u
+                heapq.heappush(heap, (d+w, v))
+    return parent, steps
+
+def intersection_clusters(network, nanowire):
+    """
+    The vertex ids of every intersection (its positions and junction 'x{i}')
+    """
+    clusters = []
+    for i in range(len(nanowire)):
+        cluster = set()
+        for branch in nanowire[i]:
+            for tup in branch:
+                if not isinstance(tup, dict):
+                    continue
+                pos = list(tup.keys())[0]
+                if pos in network.index:
+                    cluster.add(network.index[pos])
+        junction = "{}{}".format('x', i+1)
+        if junction in network.index:
+            cluster.add(network.index[junction])
+        clusters.append(cluster)
+    return clusters
@@ -0,0 +1,128 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Lattice
+
+Objectives:
+    1. Parametric Nanowire generator - rows x cols grids of X-junctions
+    2. Configurable branch length (4 branches per intersection - the cutoff voltage
+       pairs of the Nanowire are defined for X-junctions)
+    3. nanowire.yml compatible configs (structure, vertices, coordinates of the
+       positions and voltage gate nodes), for measuring the compiler at scale
+
+Functions:
+    1. grid_config
+    2. grid_directions
+    3. lattice_structure
+    4. lattice_nanowire
+    5. print_lattice
+"""
+
+import yaml
+from . import graph, nanowire
+from .nanowire import Nanowire
+
+# counter-clockwise from up (angle in degrees, unit step)
+DIRECTIONS = [(90, (0, 1)), (180, (-1, 0)), (270, (0, -1)), (0, (1, 0))]
+
+def grid_config(rows, cols, length=2, branches=4):
+    """
+    nanowire.yml config of a rows x cols grid of intersections (X-junctions). The free
+    branches have `length` positions, the neighbouring intersections share a branch of 1 position
+    """
+    if rows < 1 or cols < 1 or length < 1:
+        raise ValueError("Invalid lattice {}x{} with branches of length {}".format(rows, cols, length))
+    directions = grid_directions(branches)
+    spacing = 2
+    k = lambda r, c: r*cols+c+1
+
+    structure = {}
+    coordinates = {}
+    vertices = []
+    n_branches = 0
+    for r in range(rows):
+        for c in range(cols):
+            x = length+c*spacing
+            y = length+(rows-1-r)*spacing
+            junction = "{}{}".format('x', k(r, c))
+            structure[junction] = []
+            for angle, (dx, dy) in directions:
+                neighbour = {0: (r, c+1), 90: (r-1, c), 180: (r, c-1), 270: (r+1, c)}.get(angle)
+                if neighbour is not None and 0 <= neighbour[0] < rows and 0 <= neighbour[1] < cols:
+                    # shared branch, named from the lower intersection, listed outer to inner
+                    k1, k2 = sorted((k(r, c), k(*neighbour)))
+                    steps = range(spacing-1, 0, -1)
+                    names = ["m{}.{}.{}".format(k1, k2, j if k(r, c) == k1 else spacing-j)
+                             for j in steps]
+                else:
+                    steps = range(length, 0, -1)
+                    names = ["p{}.{}.{}".format(k(r, c), len(structure[junction])+1, j) for j in steps]
+                for name, j in zip(names, steps):
+                    if name not in coordinates:
+                        vertices.append(name)
+                        coordinates[name] = "{},{}".format(x+j*dx, y+j*dy)
+                structure[junction].append(",".join(names))
+                n_branches += 1
+            vertices.append(junction)
+            coordinates[junction] = "{},{}".format(x, y)
+            for g in range(4):
+                gx, gy = [(0.5, 0.5), (-0.5, -0.5), (-0.5, 0.5), (0.5, -0.5)][g]
+                coordinates[nanowire.voltage_gate_node(k(r, c), g+1)] = "{},{}".format(x+gx, y+gy)
+
+    return {
+        'type': "grid-{}x{}".format(rows, cols),
+        'intersections': rows*cols,
+        'branches': n_branches,
+        'voltages': 2*rows*cols,
+        'naming': {'direction': 'counter-clockwise', 'sequence': 'inwards'},
+        'vertices': ",".join(vertices),
+        'structure': structure,
+        'positions': coordinates,
+    }
+
+def grid_directions(branches):
+    """
+    The (angle, step) of the branches of an intersection, counter-clockwise from up -
+    the cutoff voltage pairs (2 gates per intersection) are only defined for 4 branches
+    """
+    if branches != len(DIRECTIONS):
+        raise ValueError("A lattice intersection has {} branches, not {}"
+                         .format(len(DIRECTIONS), branches))
+    return list(DIRECTIONS)
+
+def lattice_structure(config):
+    """
+    The Nanowire data structure (list of intersections) of the config
+    """
+    return nanowire.nanowire_yaml_to_structure_intersections(config.get('structure'))
+
+def lattice_nanowire(config):
+    """
+    The Nanowire object of the config (on the sparse compiled graph), with its coordinates
+    """
+    vertices = config.get('vertices').split(',')
+    index = dict((v, i) for i, v in enumerate(vertices))
+    edges = set()
+    for p1, p2 in nanowire.nanowire_yaml_to_links(config.get('structure')):
+        edges.add((min(index[p1], index[p2]), max(index[p1], index[p2]), 1))
+    network = graph.compile_edges(sorted(edges), len(vertices), vertices)
+    nanowire_obj = Nanowire(network, vertices, lattice_structure(config))
+    coordinates = {}
+    for key, val in config.get('positions').items():
+        pos = val.split(',')
+        coordinates[key] = (float(pos[0]), float(pos[1]))
+    nanowire_obj.initiate_coordinates(coordinates)
+    return nanowire_obj
+
+def print_lattice(file, config):
+    """
+    Print the config into the given (nanowire.yml) file
+    """
+    try:
+        with open(file, 'w') as fw:
+            yaml.safe_dump(config, fw, default_flow_style=False, sort_keys=False)
+    except IOError:
+        raise
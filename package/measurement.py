@@ -96,8 +96,11 @@ def read_fusion_channels(file, qubits):
 
 def extract_pairs(positions, file1, file2):
     """Extract zero mode pairs from the given matrix, vertices list and final positions"""
-    matrix = graph.adjacency_matrix(file1)
     vertices = nanowire.read_nanowire_vertices(file2)
+    network = nanowire.read_nanowire_matrix(file1, vertices)
+    if not isinstance(network, graph.Graph):
+        network = graph.compile_matrix(network)
+    linked = lambda u, v: any(n == v and w == 1 for n, w in zip(network.neighbours[u], network.costs[u]))
     pairs = {}
     for pos1 in positions:
         id1 = positions.index(pos1)+1
@@ -109,7 +112,7 @@ def extract_pairs(positions, file1, file2):
             if id2 in pairs:
                 continue
             p2 = vertices.index(pos2)
-            if pos1 != pos2 and (matrix[p1][p2] == 1 or matrix[p2][p1] == 1):
+            if pos1 != pos2 and (linked(p1, p2) or linked(p2, p1)):
                 pairs[id1] = id2
     return pairs
 
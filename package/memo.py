@@ -0,0 +1,68 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Memo
+
+Objectives:
+    1. Bounded (LRU) memoization of the pure Nanowire helpers, keyed on the
+       occupancy signature of the Nanowire state and the arguments
+    2. A size cap - the least recently used result is evicted, so the memory
+       of a long batch job stays bounded
+    3. Hit/miss counters
+
+Class: Memo
+
+Methods:
+    1. get
+    2. clear
+    3. info
+"""
+
+from collections import OrderedDict
+
+class Memo:
+    """
+    A least recently used cache of results
+    """
+
+    MAXSIZE = 4096
+
+    def __init__(self, maxsize=MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("The memo size should be at least 1, not {}".format(maxsize))
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, func, *args):
+        """
+        The result of func(*args) for the key, computed (and cached) on a miss
+        """
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        res = func(*args)
+        self.cache[key] = res
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return res
+
+    def clear(self):
+        """
+        Drops the cached results and resets the counters
+        """
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        (hits, misses, # cached results, size cap)
+        """
+        return self.hits, self.misses, len(self.cache), self.maxsize
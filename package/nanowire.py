@@ -21,6 +21,30 @@ Methods:
     4. get_adjacent_cutoff_pairs
     5. initiate_cutoff_voltage_pairs_opp
     6. get_opposite_cutoff_pairs
+    7. initiate_oracle
+    8. get_path
+    9. get_distances
+    10. get_shut_pairs
+    11. get_constrained_path
+    12. initiate_coordinates
+    13. initiate_astar
+    14. initiate_hierarchy
+    15. initiate_connectivity
+    16. get_alternative_path
+    17. initiate_slots
+    18. get_slot
+    19. get_intersection
+    20. get_intermediate_positions
+    21. get_positions
+    22. apply_positions
+    23. undo_positions
+    24. initiate_memo
+    25. get_signature
+    26. get_state
+    27. get_empty_positions
+    28. compute_distances
+    29. initiate_voltage_engine
+    30. get_voltage_cutoffs
 
 Functions:
     1. read_nanowire_structure_as_branches
@@ -29,27 +53,68 @@ Functions:
     4. read_nanowire_vertices
     5. extract_nanowire_vertices
     6. print_nanowire_vertices
-    7. initialise_matrix
-    8. construct_links
-    9. update_matrix
-    10. construct_adj_matrix
-    11. print_adj_matrix
-    12. nanowire_yaml_to_structure_branches
-    13. nanowire_yaml_to_structure_intersections
+    7. construct_links
+    8. construct_adj_matrix
+    9. construct_adj_edges
+    10. print_adj_edges
+    11. read_nanowire_matrix
+    12. order_nanowire_vertices
+    13. print_adj_matrix
+    14. nanowire_yaml_to_structure_branches
+    15. nanowire_yaml_to_structure_intersections
+    16. nanowire_yaml_to_links
+    17. oracle_file
+    18. nanowire_yaml_to_coordinates
+    19. read_nanowire_coordinates
+    20. cutoff_masks
+    21. voltage_gate_node
+    22. is_voltage_gate_node
 """
 
+import os
+import re
+from . import graph, hierarchy, connectivity, zeromode, memo, state, voltage, bitboard, exception
+
 class Nanowire:
     """
     A class to represent the Nanowire
     """
+
+    ORACLE_MAX_VERTICES = 2048
+    HIERARCHY_MIN_INTERSECTIONS = 4
+    ALTERNATIVE_PATHS_MAX = 16
+
     def __init__(self, matrix, vertex, nanowire):
         self.matrix = matrix
         self.vertices = vertex
         self.nanowire = nanowire
+        if isinstance(matrix, graph.Graph):
+            self.matrix = None
+            self.graph = matrix
+        else:
+            self.graph = graph.compile_matrix(matrix, vertex)
+        self.oracle = None
+        self.coordinates = None
+        self.scale = 0
+        self.astar = False
+        self.hierarchy = None
+        self.connectivity = None
+        self.routes = {}
         self.inner = []
         self.outer = []
         self.cutoff_pairs_adj = []
         self.cutoff_pairs_opp = []
+        self.cutoff_masks_adj = {}
+        self.cutoff_masks_opp = {}
+        self.slots = {}
+        self.particles = {}
+        self.signature = None
+        self.memo = None
+        self.voltage_engine = None
+        self.initiate_slots()
+        self.state = state.structure_to_state(self.nanowire)
+        self.zero_modes = zeromode.ZeroModes(self)
+        self.bitboard = bitboard.Bitboard(self)
 
     def initiate_nanowire(self, positions):
         """
@@ -57,11 +122,13 @@ class Nanowire:
         """
         for i in range(len(positions)):
             pos = positions[i]
-            for intersection in self.nanowire:
-                for branch in intersection:
-                    for tup in branch:
-                        if pos in tup:
-                            tup[pos] = (i+1)
+            for k, b, t in self.slots.get(pos, []):
+                self.nanowire[k][b][t][pos] = (i+1)
+            if pos in self.slots:
+                self.particles[i+1] = pos
+                self.state.occupancy[self.state.index[pos]] = (i+1)
+        self.signature = None
+        self.zero_modes.initiate_modes(self.nanowire, self.slots)
 
     def initiate_positions_inner_outer(self):
         """
@@ -120,6 +187,7 @@ class Nanowire:
 
             self.cutoff_pairs_adj.append(v11)
             self.cutoff_pairs_adj.append(v12)
+        self.cutoff_masks_adj = cutoff_masks(self.cutoff_pairs_adj)
 
     def initiate_cutoff_voltage_pairs_opp(self):
         """
@@ -158,6 +226,312 @@ class Nanowire:
             o12.extend(opposite)
             self.cutoff_pairs_opp.append(o11)
             self.cutoff_pairs_opp.append(o12)
+        self.cutoff_masks_opp = cutoff_masks(self.cutoff_pairs_opp)
+
+    def initiate_oracle(self, cache_dir=None):
+        """
+        Build the all-pairs shortest path oracle of the Nanowire graph, or load it
+        from the cache dir if it was saved for the same graph (keyed by its checksum)
+        (large Nanowires are routed without an oracle)
+        """
+        if len(self.graph) > Nanowire.ORACLE_MAX_VERTICES:
+            return
+        try:
+            checksum = graph.graph_checksum(self.graph)
+            file = None
+            if cache_dir is not None:
+                file = oracle_file(checksum, cache_dir)
+            if file is not None and os.path.isfile(file):
+                self.oracle = graph.load_oracle(file, checksum)
+            if self.oracle is None:
+                self.oracle = graph.all_pairs(self.graph, checksum)
+                if file is not None:
+                    graph.save_oracle(file, self.oracle)
+        except IOError:
+            raise
+
+    def get_path(self, pos1, pos2):
+        """
+        Shortest path (vertex ids) from pos1 to pos2 - on the oracle, else A* (opted in),
+        else the hierarchy or a single search
+        """
+        p1 = self.graph.index[pos1]
+        p2 = self.graph.index[pos2]
+        if self.oracle is not None:
+            return self.oracle.get_path(p1, p2)
+        if self.astar:
+            try:
+                parent = graph.astar(self.graph, p1, p2, self.coordinates, self.scale)
+                return graph.build_path(parent, p2)
+            except StopIteration as err:
+                print(err)
+                return None
+        if self.hierarchy is not None:
+            return self.hierarchy.get_path(p1, p2)
+        return graph.shortest_path(self.graph, p1, p2)
+
+    def initiate_coordinates(self, coordinates):
+        """
+        The (x, y) coordinates of every vertex for A* routing, from a
+        {position: (x, y)} dict - it isn't used unless every vertex has one
+        """
+        if any(v not in coordinates for v in self.vertices):
+            return
+        self.coordinates = tuple(coordinates[v] for v in self.vertices)
+        self.scale = graph.heuristic_scale(self.graph, self.coordinates)
+
+    def initiate_astar(self):
+        """
+        Opt-in A* routing for the Nanowires without an oracle (after initiate_coordinates) -
+        it expands fewer vertices, but answers slower than the hierarchy and BFS on the
+        generated lattices (benchmark/tqc-benchmark-routing.py)
+        """
+        self.astar = self.coordinates is not None
+
+    def initiate_hierarchy(self):
+        """
+        The 2-level (intersection) router for Nanowires with many intersections - only
+        built if get_path doesn't answer on the oracle or A* (after initiate_oracle)
+        """
+        if self.oracle is not None or self.astar or len(self.nanowire) < Nanowire.HIERARCHY_MIN_INTERSECTIONS:
+            return
+        clusters = hierarchy.intersection_clusters(self.graph, self.nanowire)
+        self.hierarchy = hierarchy.Hierarchy(self.graph, clusters)
+
+    def initiate_connectivity(self):
+        """
+        The component labels of the Nanowire under the voltage gates - the reachability
+        check of the constrained routing mode (after the cutoff voltage pairs are extracted)
+        """
+        self.connectivity = connectivity.Connectivity(self)
+
+    def initiate_voltage_engine(self):
+        """
+        The vectorized (pair-to-gate incidence) voltage gate decisions
+        (after the cutoff voltage pairs are extracted)
+        """
+        self.voltage_engine = voltage.VoltageEngine(self)
+
+    def get_voltage_cutoffs(self):
+        """
+        The cutoffs of the voltage gate decisions - the VoltageEngine if initiated,
+        else the ADJACENT cutoff masks
+        """
+        if self.voltage_engine is not None:
+            return self.voltage_engine
+        return self.cutoff_masks_adj
+
+    def get_alternative_path(self, pos1, pos2, k):
+        """
+        The kth shortest simple path (vertex ids) from pos1 to pos2, None if there
+        are fewer - the paths of every pair are generated lazily and cached
+        """
+        if k >= Nanowire.ALTERNATIVE_PATHS_MAX:
+            return None
+        key = (self.graph.index[pos1], self.graph.index[pos2])
+        if key not in self.routes:
+            self.routes[key] = graph.Routes(self.graph, key[0], key[1])
+        return self.routes[key].get_path(k)
+
+    def initiate_slots(self):
+        """
+        Index every position to its (intersection, branch, slot)s - a shared position has
+        one per intersection - and every particle to its position
+        """
+        for k in range(len(self.nanowire)):
+            for b in range(len(self.nanowire[k])):
+                for t in range(len(self.nanowire[k][b])):
+                    tup = self.nanowire[k][b][t]
+                    if not isinstance(tup, dict):
+                        continue
+                    pos = list(tup.keys())[0]
+                    self.slots.setdefault(pos, []).append((k, b, t))
+                    if tup[pos] != 0:
+                        self.particles[tup[pos]] = pos
+
+    def get_slot(self, pos):
+        """
+        The (intersection, branch, slot) of a position (or particle if an int),
+        the last intersection of a shared position as Utility.get_intersection
+        """
+        if isinstance(pos, int):
+            pos = self.particles.get(pos)
+        slots = self.slots.get(pos)
+        if slots is None:
+            return None
+        return slots[-1]
+
+    def get_intersection(self, pos):
+        """
+        The intersection of a position (or particle if an int) in the Nanowire data structure
+        """
+        slot = self.get_slot(pos)
+        if slot is None:
+            return None
+        return self.nanowire[slot[0]]
+
+    def get_intermediate_positions(self, pos):
+        """
+        The potential Intermediate positions (on the empty branches) of the intersection of pos
+        (memoized on the occupancy signature if the memo is initiated)
+        """
+        try:
+            if self.memo is not None:
+                key = ('intermediate', self.get_signature(), pos)
+                return list(self.memo.get(key, self.get_empty_positions, pos))
+            return self.get_empty_positions(pos)
+        except exception.NoEmptyPositionException:
+            raise
+
+    def get_empty_positions(self, pos):
+        """
+        The positions on the empty branches of the intersection of pos (on the State)
+        """
+        slot = self.get_slot(pos)
+        if slot is None:
+            msg = "The position {} isn't on the Nanowire".format(pos)
+            raise exception.NoEmptyPositionException(msg)
+        positions = self.state.get_empty_positions(slot[0])
+        if len(positions)==0:
+            msg = "No Empty Branches on Intersection {} to continue this braiding"\
+                    .format(slot[0]+1)
+            raise exception.NoEmptyPositionException(msg)
+        return positions
+
+    def get_positions(self, particles):
+        """
+        The positions of the given particles (ids), a shared position once per intersection
+        as Utility.get_positions_from_braids
+        """
+        positions = []
+        for par in particles:
+            pos = self.particles.get(int(par))
+            if pos is not None:
+                positions.extend([pos]*len(self.slots[pos]))
+        return positions
+
+    def get_distances(self, pos, positions, nearest=False):
+        """
+        # steps from pos to every position in the list, in a single query
+        (memoized if the memo is initiated)
+        """
+        if self.memo is not None:
+            key = ('distances', pos, tuple(positions), nearest)
+            return self.memo.get(key, self.compute_distances, pos, positions, nearest)
+        return self.compute_distances(pos, positions, nearest)
+
+    def compute_distances(self, pos, positions, nearest=False):
+        """
+        # steps from pos to every position in the list, on the oracle or the graph
+        """
+        start = self.graph.index[pos]
+        targets = [self.graph.index[p] for p in positions]
+        if self.oracle is not None:
+            steps = self.oracle.get_distances(start, targets)
+        else:
+            steps = graph.distances(self.graph, start, targets, nearest)
+        return dict((p, steps[self.graph.index[p]]) for p in positions)
+
+    def get_shut_pairs(self, voltages):
+        """
+        The (vertex id) position pairs separated by the shut voltage gates
+        """
+        shut = set()
+        for i in range(len(voltages)):
+            if voltages[i] != 'S':
+                continue
+            for pair in self.cutoff_pairs_adj[i] + self.cutoff_pairs_opp[i]:
+                shut.add(frozenset((self.graph.index[pair[0]], self.graph.index[pair[1]])))
+        return shut
+
+    def get_constrained_path(self, pos1, pos2, occupied, voltages, par):
+        """
+        Shortest legal path (vertex ids) from pos1 to pos2 - which doesn't pass through
+        the occupied positions nor across a shut voltage gate
+        """
+        p1 = self.graph.index[pos1]
+        p2 = self.graph.index[pos2]
+        shut = self.get_shut_pairs(voltages)
+        path = None
+        reachable = True
+        if self.connectivity is not None:
+            self.connectivity.update_voltages(voltages)
+            reachable = self.connectivity.is_reachable(pos1, pos2)
+        if reachable and frozenset((p1, p2)) not in shut and pos2 not in occupied:
+            blocked = set(self.graph.index[pos] for pos in occupied if pos != pos1)
+            path = graph.constrained_path(self.graph, p1, p2, blocked, shut)
+        if path is None:
+            msg = "The Particle ({}) has no path from {} to {} with the current positions and voltages [{}]"\
+                    .format(par, pos1, pos2, ', '.join(voltages))
+            raise exception.PathBlockedException(msg)
+        return path
+
+    def apply_positions(self, positions):
+        """
+        Set the Nanowire state to the positions of the particles 1..n in place (as
+        Utility.update_nanowire) - only the changed positions are written (and moved
+        in the zero modes), and the undo log of the change is returned
+        """
+        target = {}
+        for i in range(len(positions)):
+            if positions[i] in self.slots and positions[i] not in target:
+                target[positions[i]] = i+1
+        changes = []
+        for pos in set(self.particles.values()) | set(target):
+            k, b, t = self.slots[pos][0]
+            par = self.nanowire[k][b][t][pos]
+            if par != target.get(pos, 0):
+                changes.append((pos, par))
+                for k, b, t in self.slots[pos]:
+                    self.nanowire[k][b][t][pos] = target.get(pos, 0)
+                self.state.occupancy[self.state.index[pos]] = target.get(pos, 0)
+                self.zero_modes.move(pos, target.get(pos, 0))
+        log = (self.particles, self.signature, changes)
+        self.particles = dict((par, pos) for pos, par in target.items())
+        if changes:
+            self.signature = None
+        return log
+
+    def undo_positions(self, log):
+        """
+        Roll back the change of apply_positions with its undo log
+        """
+        particles, signature, changes = log
+        for pos, par in reversed(changes):
+            self.zero_modes.move(pos, par)
+            for k, b, t in self.slots[pos]:
+                self.nanowire[k][b][t][pos] = par
+            self.state.occupancy[self.state.index[pos]] = par
+        self.particles = particles
+        self.signature = signature
+
+    def initiate_memo(self, maxsize=memo.Memo.MAXSIZE):
+        """
+        Opt-in bounded (LRU) memoization of the intermediate positions and the distances
+        """
+        self.memo = memo.Memo(maxsize)
+
+    def get_signature(self):
+        """
+        The occupancy signature of the Nanowire state - the interned FrozenState of
+        the particle on every position (cached until the state changes)
+        """
+        if self.signature is None:
+            occupancy = [0]*len(self.vertices)
+            for par, pos in self.particles.items():
+                occupancy[self.graph.index[pos]] = par
+            self.signature = state.freeze(occupancy)
+        return self.signature
+
+    def get_state(self, utility=None):
+        """
+        The interned (immutable, hashable) state of the Nanowire and the voltage gates of the Utility
+        """
+        shut = 0
+        if utility is not None:
+            shut = utility.shut
+        return self.get_signature().with_voltages(shut)
+
 
 #
 def read_nanowire_structure_as_branches(file):
@@ -278,17 +652,6 @@ def print_nanowire_vertices(file, vertices):
         raise
 
 #
-def initialise_matrix(vertices):
-    """
-    Initialize the adjacency matrix
-    """
-    n = len(vertices)
-    matrix = []
-    for _ in range(n):
-        row = [0 for _ in range(n)]
-        matrix.append(row)
-    return matrix
-
 def construct_links(structure):
     """
     Construct links according to the given structure
@@ -312,30 +675,91 @@ def construct_links(structure):
             links.append([el, intermediate])
     return links
 
-def update_matrix(matrix, vertices, state, node1, node2):
+def construct_adj_matrix(vertices, structure, edges=None, links=None):
     """
-    construct_adj_matrix helper function
+    Construct the (dense) Nanowire graph adjacency matrix (of the edge list, if given) -
+    only for the opted-in dense matrix file, the compiler routes on the edge list
     """
-    vertices = list(vertices)
-    n1 = vertices.index(node1)
-    n2 = vertices.index(node2)
-    matrix[n1][n2] = state
+    if edges is None:
+        edges = construct_adj_edges(vertices, structure, links)
+    return graph.edges_to_matrix(edges, len(vertices)).tolist()
 
-def construct_adj_matrix(vertices, structure):
+def construct_adj_edges(vertices, structure, links=None):
     """
-    Construct the Nanowire graph adjacency matrix
+    Construct the (sparse) Nanowire graph adjacency edge list [(u, v, 1)] of the
+    vertex ids, in O(V+E) - from the links of the structure, if not given
     """
     state_1 = 1
-    matrix = initialise_matrix(vertices)
-    links = construct_links(structure)
+    index = dict((v, i) for i, v in enumerate(vertices))
+    if links is None:
+        links = construct_links(structure)
+    edges = set()
     for branch in links:
-        b1 = branch[0]
-        b2 = branch[1]
-        update_matrix(matrix, vertices, state_1, b1, b1)
-        update_matrix(matrix, vertices, state_1, b1, b2)
-        update_matrix(matrix, vertices, state_1, b2, b2)
-        update_matrix(matrix, vertices, state_1, b2, b1)
-    return matrix
+        n1 = index[branch[0]]
+        n2 = index[branch[1]]
+        edges.add((min(n1, n2), max(n1, n2), state_1))
+    return sorted(edges)
+
+def print_adj_edges(file, edges):
+    """
+    Print the adjacency edge list into the given file
+    """
+    try:
+        fw = open(file, 'w')
+        fw.write(graph.EDGES_HEADER+'\n')
+        for edge in edges:
+            fw.write(",".join(str(e) for e in edge)+'\n')
+        fw.close()
+    except IOError:
+        raise
+
+def read_nanowire_matrix(file, vertices):
+    """
+    Read the adjacency matrix (validated, memory-mapped if binary) or edge list
+    (compiled graph) from the given file
+    """
+    try:
+        if graph.is_adjacency_binary(file):
+            matrix = graph.load_matrix(file)
+            graph.validate_matrix(matrix)
+            return matrix
+        if graph.is_adjacency_edges(file):
+            return graph.compile_edges(graph.adjacency_edges(file), len(vertices), vertices)
+        matrix = graph.adjacency_matrix(file)
+        graph.validate_matrix(matrix)
+        return matrix
+    except IOError:
+        raise
+
+def order_nanowire_vertices(vertices, structure, links=None):
+    """
+    Deterministic Reverse Cuthill-McKee order of the vertices (by degree, then name),
+    which keeps the linked vertices close - a banded Adjacency matrix
+    """
+    if links is None:
+        links = construct_links(structure)
+    neighbours = dict((v, set()) for v in vertices)
+    for link in links:
+        if link[0] != link[1]:
+            neighbours[link[0]].add(link[1])
+            neighbours[link[1]].add(link[0])
+    rank = lambda v: (len(neighbours[v]), v)
+
+    order = []
+    visited = set()
+    for start in sorted(neighbours, key=rank):
+        if start in visited:
+            continue
+        visited.add(start)
+        i = len(order)
+        order.append(start)
+        while i < len(order):
+            for v in sorted(neighbours[order[i]] - visited, key=rank):
+                visited.add(v)
+                order.append(v)
+            i += 1
+    order.reverse()
+    return order
 
 def print_adj_matrix(file, matrix):
     """
@@ -397,38 +821,96 @@ def get_opposite_cutoff_pairs(c):
     return opposite
 
 def nanowire_yaml_to_structure_branches(structure):
-    """convert the yaml object to the acceptable structure"""
-    x1 = structure.get('x1')
-    x2 = structure.get('x2')
-    x1.extend(x2)
+    """convert the yaml object (intersections x1..xN) to the acceptable structure"""
     nanowire_structure = []
-    for b in x1:
-        nanowire_structure.append(b.split(','))
+    for i in range(len(structure)):
+        for b in structure.get("{}{}".format('x', i+1)):
+            nanowire_structure.append(b.split(','))
     return nanowire_structure
 
 def nanowire_yaml_to_structure_intersections(structure):
-    """convert the yaml object to the acceptable structure"""
+    """convert the yaml object (intersections x1..xN) to the acceptable structure"""
     nanowire_structure = []
-    x1 = structure.get('x1')
-    inter = []
-    for b in x1:
-        bl = []
-        for t in b.split(','):
-            g = {}
-            g[t] = 0
-            bl.append(g)
-        inter.append(bl)
-    nanowire_structure.append(inter)
-
-    x2 = structure.get('x2')
-    inter = []
-    for b in x2:
-        bl = []
-        for t in b.split(','):
-            g = {}
-            g[t] = 0
-            bl.append(g)
-        inter.append(bl)
-    nanowire_structure.append(inter)
-
+    for i in range(len(structure)):
+        inter = []
+        for b in structure.get("{}{}".format('x', i+1)):
+            bl = []
+            for t in b.split(','):
+                g = {}
+                g[t] = 0
+                bl.append(g)
+            inter.append(bl)
+        nanowire_structure.append(inter)
     return nanowire_structure
+
+def nanowire_yaml_to_links(structure):
+    """
+    Links of the yaml object (intersections x1..xN) - consecutive positions of
+    every branch, and the inner position of a branch to its intersection
+    """
+    links = []
+    for i in range(len(structure)):
+        junction = "{}{}".format('x', i+1)
+        for b in structure.get(junction):
+            branch = b.split(',')
+            for j in range(len(branch)-1):
+                links.append([branch[j], branch[j+1]])
+            links.append([branch[-1], junction])
+    return links
+
+def oracle_file(checksum, cache_dir):
+    """
+    The path of the saved oracle of the graph checksum, in the cache dir
+    """
+    return os.path.join(cache_dir, 'nanowire-oracle-{}.npz'.format(checksum))
+
+def nanowire_yaml_to_coordinates(positions):
+    """convert the yaml positions to a {position: (x, y)} dict"""
+    coordinates = {}
+    for key, val in positions.items():
+        pos = str(val).split(',')
+        coordinates[str(key)] = (float(pos[0]), float(pos[1]))
+    return coordinates
+
+def read_nanowire_coordinates(file):
+    """
+    Read the Nanowire positions file (Node,X,Y) as a {position: (x, y)} dict
+    """
+    coordinates = {}
+    try:
+        fr = open(file, 'r')
+        fr.readline()
+        for line in fr:
+            row = [e.strip() for e in line.split(',')]
+            if len(row) < 3:
+                continue
+            coordinates[row[0]] = (float(row[1]), float(row[2]))
+        fr.close()
+        return coordinates
+    except IOError:
+        raise
+
+def cutoff_masks(cutoff_pairs):
+    """
+    Index of the cutoff pairs - unordered position pair -> bitmask of the
+    voltage gates (bit i for the gate i) which separate it
+    """
+    masks = {}
+    for i in range(len(cutoff_pairs)):
+        for pair in cutoff_pairs[i]:
+            key = frozenset(pair)
+            masks[key] = masks.get(key, 0) | (1 << i)
+    return masks
+
+def voltage_gate_node(k, g):
+    """
+    The name of the node g (1-4) of the voltage gates of the intersection k (from 1)
+    - 'x{k}.{g}', the gate i is the pair of nodes 2*(i%2)+1, 2*(i%2)+2 of the intersection i//2+1
+    """
+    return "{}{}.{}".format('x', k, g)
+
+def is_voltage_gate_node(node):
+    """
+    Check if the node is a voltage gate node ('x{k}.{g}') and not a position
+    """
+    return re.match(r'^x\d+\.\d+$', str(node)) is not None
@@ -0,0 +1,64 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Runner
+
+Objectives:
+    1. Runs (compiles) the braid sequence of a gate - every braiding op on its own
+       Nanowire, Compiler, Braiding and Utility objects (a run has no shared state)
+    2. Independent braid sequences (of separate Nanowires) compiled in a thread pool
+       within one process (truly parallel on a free-threaded CPython build)
+
+Functions:
+    1. braid_sequence
+    2. compile_pool
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from . import validation, metrics
+from .utility import Utility
+
+def braid_sequence(braid, utility, files, verbose=True):
+    """
+    Performing braiding on each sequence of the Compiler of the Braiding object
+    files - (particle positions, particle movements, nanowire states, particle
+    positions braid) output files
+    """
+    nanowire_obj = braid.nanowire
+    compiler_obj = braid.compiler
+    file_pos, file_mvmt, file_state, file_braid = files
+    n = len(compiler_obj.positions)
+    line_pos = Utility.get_par_braid_pos(n)
+    metrics.update_particle_line_positions(file_braid, (0,0), line_pos)
+    for i in range(len(compiler_obj.sequence)):
+        pair = compiler_obj.sequence[i]
+        utility.reset_variables(compiler_obj.positions)
+        utility.refresh_zero_modes()
+        if verbose:
+            print("----- Braiding particles {} -----".format(pair))
+
+        condition = validation.check_unibranch_validity(pair, compiler_obj.positions, nanowire_obj)
+
+        if condition:
+            braid.braid_particles_same_branch(pair, utility, file_mvmt, file_state)
+        else:
+            braid.braid_particles_diff_branch(pair, utility, file_mvmt, file_state)
+
+        line_pos = Utility.update_par_braid_pos(line_pos, pair)
+        metrics.update_particle_line_positions(file_braid, pair, line_pos)
+
+    metrics.update_final_particle_positions(file_pos, compiler_obj.positions)
+    return compiler_obj.positions
+
+def compile_pool(jobs, workers=None):
+    """
+    Compiles the independent jobs [(braid, utility, files)] in a thread pool,
+    the final positions of every job (in order) - the 1st failed job raises
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(braid_sequence, braid, utility, files, False)
+                   for braid, utility, files in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,253 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: State
+
+Objectives:
+    1. Compact (array-backed) Nanowire occupancy state
+    2. Positions are small integers, the occupancy is a NumPy array
+       (particle id or 0) and the layout is a set of static index arrays
+    3. Conversion to and from the Nanowire data structure (a list of intersections
+       of lists of branches of {position: particle} dicts)
+    4. Immutable, interned (hash-consed) states - the particle on every position and
+       the shut voltage gate mask, with a precomputed hash - usable as dict keys
+
+Class:
+    1. State
+    2. FrozenState
+
+Methods (State):
+    1. copy
+    2. update_positions
+    3. get_particle
+    4. get_positions
+    5. get_branch
+    6. get_branch_particles
+    7. get_empty_branches
+    8. get_empty_positions
+    9. to_structure
+
+Methods (FrozenState):
+    1. with_voltages
+    2. get_particle
+
+Functions:
+    1. structure_to_state
+    2. freeze
+    3. intern
+"""
+
+import threading
+import weakref
+import numpy as np
+
+INTERNED = weakref.WeakValueDictionary()
+INTERNED_LOCK = threading.Lock()
+
+class State:
+    """
+    Nanowire occupancy state
+        names[p]     - name of the position p (and index[name] = p)
+        occupancy[p] - particle on the position p (0 if empty)
+        slots        - position of every slot, in the order of the Nanowire structure
+        branches     - slots of the branch b: slots[branches[b]:branches[b+1]]
+        intersections- branches of the intersection k: intersections[k]:intersections[k+1]
+    The layout (names, index, slots, branches, intersections) is shared by the copies
+    """
+
+    def __init__(self, names, slots, branches, intersections, occupancy=None):
+        self.names = names
+        self.index = dict((names[p], p) for p in range(len(names)))
+        self.slots = slots
+        self.branches = branches
+        self.intersections = intersections
+        if occupancy is None:
+            occupancy = np.zeros(len(names), dtype=np.int32)
+        self.occupancy = occupancy
+
+    def copy(self):
+        """
+        A copy of the state (the occupancy array only)
+        """
+        state = State.__new__(State)
+        state.__dict__.update(self.__dict__)
+        state.occupancy = self.occupancy.copy()
+        return state
+
+    def update_positions(self, positions):
+        """
+        Set the occupancy from the positions of the particles 1..n
+        (as Utility.update_nanowire)
+        """
+        self.occupancy[:] = 0
+        for i in range(len(positions)):
+            p = self.index.get(positions[i])
+            if p is not None:
+                self.occupancy[p] = i+1
+
+    def get_particle(self, pos):
+        """
+        The particle on the position (name), 0 if empty
+        """
+        return int(self.occupancy[self.index[pos]])
+
+    def get_positions(self, n):
+        """
+        The positions (names) of the particles 1..n, None if not on the Nanowire
+        """
+        positions = [None]*n
+        for p in np.flatnonzero(self.occupancy):
+            par = int(self.occupancy[p])
+            if par <= n:
+                positions[par-1] = self.names[p]
+        return positions
+
+    def get_branch(self, k, b):
+        """
+        The positions (ids) of the branch b of the intersection k
+        """
+        j = self.intersections[k]+b
+        return self.slots[self.branches[j]:self.branches[j+1]]
+
+    def get_branch_particles(self):
+        """
+        # particles on every branch
+        """
+        occupied = np.concatenate(([0], np.cumsum(self.occupancy[self.slots] != 0)))
+        return occupied[self.branches[1:]]-occupied[self.branches[:-1]]
+
+    def get_empty_branches(self):
+        """
+        # empty branches of every intersection
+        """
+        empty = np.concatenate(([0], np.cumsum(self.get_branch_particles() == 0)))
+        return empty[self.intersections[1:]]-empty[self.intersections[:-1]]
+
+    def get_empty_positions(self, k):
+        """
+        The positions (names) on the empty branches of the intersection k, in order
+        (as Utility.get_empty_positions)
+        """
+        positions = []
+        for j in range(self.intersections[k], self.intersections[k+1]):
+            slots = self.slots[self.branches[j]:self.branches[j+1]]
+            if not self.occupancy[slots].any():
+                positions.extend(self.names[p] for p in slots)
+        return positions
+
+    def to_structure(self):
+        """
+        The Nanowire data structure of the state
+        """
+        nanowire = []
+        for k in range(len(self.intersections)-1):
+            intersection = []
+            for j in range(self.intersections[k], self.intersections[k+1]):
+                branch = []
+                for p in self.slots[self.branches[j]:self.branches[j+1]]:
+                    branch.append({self.names[p]: int(self.occupancy[p])})
+                intersection.append(branch)
+            nanowire.append(intersection)
+        return nanowire
+
+class FrozenState:
+    """
+    Immutable Nanowire state
+        occupancy - particle on every position (0 if empty), in the vertex order
+        shut      - bitmask of the shut voltage gates (bit i for the gate i)
+    The hash is computed once, and equal states built by freeze are the same (interned) object
+    """
+
+    __slots__ = ('_occupancy', '_shut', '_occupancy_hash', '_hash', '__weakref__')
+
+    def __init__(self, occupancy, shut=0, occupancy_hash=None):
+        if occupancy_hash is None:
+            occupancy_hash = hash(occupancy)
+        self._occupancy = occupancy
+        self._shut = shut
+        self._occupancy_hash = occupancy_hash
+        self._hash = hash((occupancy_hash, shut))
+
+    # read-only attributes
+    occupancy = property(lambda self: self._occupancy)
+    shut = property(lambda self: self._shut)
+    occupancy_hash = property(lambda self: self._occupancy_hash)
+    hash = property(lambda self: self._hash)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, FrozenState):
+            return NotImplemented
+        return self.hash == other.hash and self.shut == other.shut and\
+            (self.occupancy is other.occupancy or self.occupancy == other.occupancy)
+
+    def __repr__(self):
+        return "FrozenState({}, {})".format(self.occupancy, self.shut)
+
+    def with_voltages(self, shut):
+        """
+        The (interned) state of the same occupancy with the given shut gate mask
+        """
+        if shut == self.shut:
+            return self
+        return intern(FrozenState(self.occupancy, shut, self.occupancy_hash))
+
+    def get_particle(self, p):
+        """
+        The particle on the position (vertex id) p, 0 if empty
+        """
+        return self.occupancy[p]
+
+def structure_to_state(nanowire):
+    """
+    The State of the Nanowire data structure
+    """
+    names = []
+    index = {}
+    slots = []
+    branches = [0]
+    intersections = [0]
+    particles = {}
+    for intersection in nanowire:
+        for branch in intersection:
+            for tup in branch:
+                if not isinstance(tup, dict):
+                    continue
+                pos = list(tup.keys())[0]
+                if pos not in index:
+                    index[pos] = len(names)
+                    names.append(pos)
+                slots.append(index[pos])
+                if tup[pos] != 0:
+                    particles[index[pos]] = tup[pos]
+            branches.append(len(slots))
+        intersections.append(len(branches)-1)
+    state = State(names, np.array(slots, dtype=np.int32), np.array(branches, dtype=np.int32),
+                  np.array(intersections, dtype=np.int32))
+    for p, par in particles.items():
+        state.occupancy[p] = par
+    return state
+
+def freeze(occupancy, shut=0):
+    """
+    The interned FrozenState of the occupancy (particle per position) and the shut gate mask
+    """
+    return intern(FrozenState(tuple(occupancy), shut))
+
+def intern(state):
+    """
+    The interned state equal to the given state
+    """
+    with INTERNED_LOCK:
+        res = INTERNED.get(state)
+        if res is None:
+            INTERNED[state] = state
+            res = state
+        return res
@@ -9,39 +9,62 @@ Module: Utility
 Objectives:
     1. TQC Braiding Nanowire Algorithm - Utility functions
 
-Class: Utility
+Class:
+    1. BraidContext
+    2. Utility
 
-Methods:
+Methods (Utility):
     @self
     1. reset_variables
     2. update_zero_modes
     3. refresh_zero_modes
-    4. get_isolated_particles
-    5. update_voltages
-    6. check_particle_pair_zmode
-    7. check_pair_zmode
-    8. check_particle_zmode
-    9. get_positions_from_braids
+    4. set_zero_modes
+    5. get_isolated_particles
+    6. update_voltages
+    7. get_shut_gates
+    8. set_voltages
+    9. check_particle_pair_zmode
+    10. check_pair_zmode
+    11. check_particle_zmode
+    12. get_positions_from_braids
 
     @classmethod
-    9. get_par_braid_pos
-    10. update_par_braid_pos
-    11. get_final_positions
-    12. update_nanowire
-    13. get_steps
-    14. comparator
-    15. get_intermediate_positions
-    16. get_intersection
-    17. get_empty_positions
-    18. get_other_particle
-    19. get_permutations
+    13. get_par_braid_pos
+    14. update_par_braid_pos
+    15. get_final_positions
+    16. update_nanowire
+    17. comparator
+    18. get_intermediate_positions
+    19. get_intersection
+    20. get_empty_positions
+    21. get_other_particle
 """
 
-from itertools import permutations
+from itertools import combinations
 import copy
-from . import graph
+import numpy as np
+from . import zeromode, voltage
 from . import exception
 
+class BraidContext():
+    """
+    The state of a run (compilation) of braiding ops - the voltage gate which is shut
+    to isolate 2 single particles; shared by the Utility of every gate of a circuit
+    """
+
+    def __init__(self):
+        self.gate_index = -1
+        self.gate_flag = False
+        self.gate_flag_ex = False
+
+    def reset(self):
+        """
+        Resets the gate of the braiding op
+        """
+        self.gate_index = -1
+        self.gate_flag = False
+        self.gate_flag_ex = False
+
 class Utility():
     """
     A class of Utility functions
@@ -49,14 +72,16 @@ class Utility():
 
     VOLTAGE_OPEN = 'O'
     VOLTAGE_SHUT = 'S'
-    gate_index = -1
-    gate_flag = False
-    gate_flag_ex = False
 
-    def __init__(self):
-        self.voltages = ['O', 'O', 'O', 'O']
-        self.zmodes_old = []
-        self.zmodes_new = []
+    def __init__(self, gates=4, context=None):
+        self.context = context
+        if context is None:
+            self.context = BraidContext()
+        self.voltages = [Utility.VOLTAGE_OPEN]*gates
+        self.shut = 0
+        self.zmodes_old = set()
+        self.zmodes_new = set()
+        self.partners = {}
         self.positions_old = []
 
     def reset_variables(self, positions_new):
@@ -64,84 +89,121 @@ class Utility():
         Resets [positions_old, gate_flag] variables
         """
         self.positions_old = copy.copy(positions_new)
-        if Utility.gate_flag:
-            Utility.gate_index = -1
-            Utility.gate_flag = False
-            Utility.gate_flag_ex = False
+        if self.context.gate_flag:
+            self.context.reset()
 
     def update_zero_modes(self, nanowire):
         """
-        A list of Zero mode pairs DURING a braiding op
+        The set of Zero mode pairs DURING a braiding op
+        (from the zero mode tracker of the Nanowire, else by scanning the Nanowire data structure)
         """
-        zmodes = []
-        # if the pair is on same branch
-        for intersection in nanowire:
-            for branch in intersection:
-                pair = []
-                for tup in branch:
-                    if not isinstance(tup, dict):
-                        continue
-                    par = list(tup.values())[0]
-                    if par is not 0:
-                        pair.append(par)
-                if len(pair)==2:
-                    zmodes.append(pair)
+        if isinstance(nanowire, zeromode.ZeroModes):
+            zmodes = nanowire.get_zero_modes()
+        else:
+            zmodes = zeromode.structure_zero_modes(nanowire)
 
-        if len(self.zmodes_new) is 0:
+        if len(self.zmodes_new) == 0:
             self.zmodes_new = zmodes
 
-        for el in self.zmodes_new:
-            if el not in self.zmodes_old:
-                self.zmodes_old.append(el)
-        self.zmodes_new = zmodes
+        self.zmodes_old |= self.zmodes_new
+        self.set_zero_modes(zmodes)
 
     def refresh_zero_modes(self):
         """
-        A list of Zero mode pairs AFTER a braiding op
+        The set of Zero mode pairs AFTER a braiding op
         """
         self.zmodes_old = self.zmodes_new
-        self.zmodes_new = []
+        self.set_zero_modes(set())
+
+    def set_zero_modes(self, zmodes):
+        """
+        Set the current Zero mode pairs, and index every particle to its partner
+        """
+        self.zmodes_new = zmodes
+        self.partners = {}
+        for p1, p2 in zmodes:
+            self.partners[p1] = p2
+            self.partners[p2] = p1
 
     def get_isolated_particles(self, positions):
         """
         Get Isolated particles which are NOT part of any zero mode
         (in the middle of a braiding operation)
         """
-        positions_paired = []
-        particles_paired = []
-        for zm in self.zmodes_new:
-            particles_paired.extend(zm)
-        positions_paired = [positions[par-1] for par in particles_paired]
-        return list(set(positions)-set(positions_paired))
+        positions_paired = set(positions[par-1] for par in self.partners)
+        return list(set(positions)-positions_paired)
 
-    def update_voltages(self, positions, cutoff_pairs):
+    def update_voltages(self, positions, cutoffs):
         """
         Get Voltage Gate Changes if braiding involves particles from different zero modes.
+        (cutoffs - position pair -> bitmask of the gates which separate it, or the
+        VoltageEngine of the Nanowire)
+        The shut gates are the OR of the masks of the isolated pairs which aren't
+        zero modes, in a single pass over the pairs
         """
         positions_single = self.get_isolated_particles(positions)
         if len(positions_single)>1:
-            perm = Utility.get_permutations(positions_single, 2)
-            for i in range(len(cutoff_pairs)):
-                pairs = cutoff_pairs[i]
-                val = False
-                for pair in perm:
-                    if (pair in pairs or list(reversed(pair)) in pairs) and\
-                        (not self.check_particle_pair_zmode(pair, positions, positions_single, i)):
-                        val = True
-                        break
-                if val:
-                    self.voltages[i] = Utility.VOLTAGE_SHUT
-                else:
-                    self.voltages[i] = Utility.VOLTAGE_OPEN
-
-            if Utility.gate_flag is True and Utility.gate_flag_ex is False:
-                inter = len(self.voltages)/2
-                Utility.gate_index += 1
-                offset = 0
-                if Utility.gate_index>=inter:
-                    offset = inter
-                self.voltages[int(Utility.gate_index%inter+offset)] = Utility.VOLTAGE_SHUT
-                Utility.gate_flag_ex = True
+            if isinstance(cutoffs, voltage.VoltageEngine):
+                shut = self.get_shut_gates(cutoffs, positions, positions_single)
+            else:
+                shut = 0
+                for pair in combinations(positions_single, 2):
+                    mask = cutoffs.get(frozenset(pair), 0)
+                    if mask & ~shut and not self.check_particle_pair_zmode(pair, positions,
+                            positions_single, (mask & -mask).bit_length()-1):
+                        shut |= mask
+
+            context = self.context
+            if context.gate_flag is True and context.gate_flag_ex is False:
+                # the other gate of the intersection (gate_index//2) of the marked gate
+                k = context.gate_index//2
+                shut |= 1 << (2*k + (context.gate_index+1)%2)
+                context.gate_flag_ex = True
+            self.set_voltages(shut)
+
+    def get_shut_gates(self, engine, positions, positions_single):
+        """
+        The bitmask of the shut gates (as update_voltages) with the VoltageEngine - the
+        zero mode exemptions of all the isolated pairs are computed as arrays, and the
+        gates are a reduction of the incidence rows of the pairs which aren't exempt
+        """
+        first = {}
+        for i in range(len(positions)-1, -1, -1):
+            first[positions[i]] = i+1
+        ids = np.array([engine.index[pos] for pos in positions_single])
+        particles = np.array([first[pos] for pos in positions_single])
+        i, j = engine.get_pairs(len(positions_single))
+        rows = engine.get_pair_rows(ids, i, j)
+
+        # a pair is exempt if it is a zero mode or a particle is part of one
+        zmodes = list(self.zmodes_old | self.zmodes_new)
+        keys = np.sort(voltage.pair_keys([min(zm) for zm in zmodes], [max(zm) for zm in zmodes],
+                                         len(positions)+1))
+        queries = voltage.pair_keys(particles[i], particles[j], len(positions)+1)
+        pair_zmode = np.isin(queries, keys)
+        paired = np.array([par in self.partners for par in particles.tolist()], dtype=bool)
+        exempt = pair_zmode | paired[i] | paired[j]
+
+        # 2 single particles - the gate separating them is marked for the braiding context
+        if len(positions_single) == 2:
+            if not exempt[0] and rows[0] >= 0 and engine.incidence[rows[0]].any():
+                if self.context.gate_flag is False:
+                    self.context.gate_index = int(np.argmax(engine.incidence[rows[0]]))
+                    self.context.gate_flag = True
+            exempt[:] = True
+        return voltage.VoltageEngine.get_shut_mask(engine.get_gates(rows, exempt))
+
+    def set_voltages(self, shut):
+        """
+        Set the voltage gates to the bitmask of the shut gates (bit i for the gate i),
+        and their string ('O'/'S') form in place for the outputs
+        """
+        self.shut = shut
+        for i in range(len(self.voltages)):
+            if (shut >> i) & 1:
+                self.voltages[i] = Utility.VOLTAGE_SHUT
+            else:
+                self.voltages[i] = Utility.VOLTAGE_OPEN
 
     def check_particle_pair_zmode(self, pair_pos, positions, positions_single, i):
         """
@@ -157,15 +219,10 @@ class Utility():
         """
         p1 = positions.index(pair_pos[0])+1
         p2 = positions.index(pair_pos[1])+1
-        pair = [p1, p2]
-        val = False
+        pair = frozenset((p1, p2))
 
         # Checks if the pair is a zero mode
-        if pair in self.zmodes_old or list(reversed(pair)) in self.zmodes_old:
-            val = True
-        elif pair in self.zmodes_new or list(reversed(pair)) in self.zmodes_new:
-            val = True
-        return val
+        return pair in self.zmodes_old or pair in self.zmodes_new
 
     def check_particle_zmode(self, pair_pos, positions, positions_single, i):
         """
@@ -173,24 +230,15 @@ class Utility():
         """
         p1 = positions.index(pair_pos[0])+1
         p2 = positions.index(pair_pos[1])+1
-        val1 = val2 = False
-
-        for zmode in self.zmodes_new:
-            if p1 in zmode:
-                val1 = True
-                break
-
-        for zmode in self.zmodes_new:
-            if p2 in zmode:
-                val2 = True
-                break
+        val1 = p1 in self.partners
+        val2 = p2 in self.partners
 
         if val1 is True or val2 is True:
             return True
         if val1 is False and val2 is False and len(positions_single) is 2:
-            if Utility.gate_flag is False and i is not None:
-                Utility.gate_index = i
-                Utility.gate_flag = True
+            if self.context.gate_flag is False and i is not None:
+                self.context.gate_index = i
+                self.context.gate_flag = True
             return True
         return False
 
@@ -267,16 +315,6 @@ class Utility():
                         tup[pos] = 0
         return i_nw
 
-    @classmethod
-    def get_steps(cls, matrix, vertex, pos1, pos2):
-        """
-        Returns # steps from initial to final position
-        """
-        p1 = vertex.index(pos1)
-        p2 = vertex.index(pos2)
-        path = graph.route(matrix, p1, p2)
-        return len(path)-1
-
     @classmethod
     def comparator(cls, pos1, steps1, pos2, steps2):
         """
@@ -371,17 +409,3 @@ class Utility():
                     res = val
                     break
         return res
-
-    @classmethod
-    def get_permutations(cls, array, n):
-        """
-        Returns list permutations of size n for an array
-        """
-        perm0 = permutations(array, n)
-        perm = []
-        for p in perm0:
-            pair = list(p)
-            if pair in perm or list(reversed(pair)) in perm:
-                continue
-            perm.append(pair)
-        return perm
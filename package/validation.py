@@ -15,19 +15,24 @@ Functions:
     3. validate_multi_modal_crossing
     4. validate_path_particle
     5. validate_path_gates
-    6. verify_cutoff_pair
-    7. get_voltage_gate_values
-    8. check_unibranch_validity
-    9. validate_particle_positions
-    10. validate_branch_config
+    6. get_cutoff_gate
+    7. get_shut_mask
+    8. get_voltage_gate_values
+    9. check_unibranch_validity
+    10. validate_particle_positions
+    11. validate_branch_config
 """
 
+from itertools import combinations
 from . import exception
+from .nanowire import voltage_gate_node
 from .utility import Utility
 
 def validate_nanowire_state(nw, positions, utility, positions_single, voltages, nanowire,type,msg):
     """
     Nanowire Validation Algorithm which returns a score
+    (the empty branch rule with the bitboard of the Nanowire object, for the positions -
+    the Nanowire data structure nw is only walked without one)
     """
     try:
         min_free_branch = 0
@@ -35,7 +40,10 @@ def validate_nanowire_state(nw, positions, utility, positions_single, voltages,
             min_free_branch = 1
         elif type==1:
             min_free_branch = 2
-        score = validate_empty_branches(nw, min_free_branch, msg)
+        if nanowire is not None and nanowire.bitboard is not None:
+            score = nanowire.bitboard.validate_empty_branches(positions, min_free_branch)
+        else:
+            score = validate_empty_branches(nw, min_free_branch, msg)
         if score>0:
             validate_multi_modal_crossing(positions, positions_single, voltages, utility, nanowire,msg)
         return score
@@ -76,11 +84,10 @@ def validate_multi_modal_crossing(positions, positions_single, voltages, utility
     """
     *Check if resulting nanowire violates Rule 3 - Particle-Zero mode isolation
     """
-    perm = Utility.get_permutations(positions_single, 2)
-    for pair in perm:
+    for pair in combinations(positions_single, 2):
         flag1 = utility.check_particle_pair_zmode(pair, positions, positions_single, None)
-        flag2 = verify_cutoff_pair(nanowire.cutoff_pairs_adj, pair, voltages)
-        flag3 = verify_cutoff_pair(nanowire.cutoff_pairs_opp, pair, voltages)
+        flag2 = get_cutoff_gate(nanowire, pair, voltages)
+        flag3 = get_cutoff_gate(nanowire, pair, voltages, True)
         if flag1 is False and (flag2 is True or flag3 is True):
             raise exception.MultiModalCrossingException(msg)
 
@@ -102,21 +109,22 @@ def validate_path_particle(path, positions, vertices, par):
         raise exception.PathBlockedException(msg)
     return block
 
-def validate_path_gates(par, path, vertices, voltages, cutoff_pairs, cutoff_pairs_opp):
+def validate_path_gates(par, path, nanowire, voltages):
     """
     Checks if a shut voltage gate blocks the path
     """
+    vertices = nanowire.vertices
     p1 = vertices[path[0]]
     pn = vertices[path[len(path)-1]]
     pair = [p1, pn]
     gates = []
 
-    flag1 = verify_cutoff_pair(cutoff_pairs, pair, voltages)
+    flag1 = get_cutoff_gate(nanowire, pair, voltages)
     gate1 = get_voltage_gate_values(flag1)
     if gate1 is not None:
         gates.append(gate1)
     else:
-        flag2 = verify_cutoff_pair(cutoff_pairs_opp, pair, voltages)
+        flag2 = get_cutoff_gate(nanowire, pair, voltages, True)
         gate2 = get_voltage_gate_values(flag2)
         if gate2 is not None:
             gates.append(gate2)
@@ -128,50 +136,45 @@ def validate_path_gates(par, path, vertices, voltages, cutoff_pairs, cutoff_pair
         raise exception.PathBlockedException(msg)
     return True
 
-def verify_cutoff_pair(cutoff, pair, voltages):
+def get_cutoff_gate(nanowire, pair, voltages, opposite=False):
     """
-    Returns [0-4] if the pair is in the cutoff_pair
+    The lowest shut voltage gate which separates the pair, from the ADJACENT (or OPPOSITE)
+    cutoff masks of the Nanowire - (mask of the pair) AND (shut gate mask), else -1
     """
-    flag = -1
-    for i in range(len(cutoff)):
-        pairs = cutoff[i]
-        if pair in pairs or list(reversed(pair)) in pairs:
-            if voltages[i] is 'S':
-                flag = i
-                return flag
-    return flag
+    masks = nanowire.cutoff_masks_opp if opposite else nanowire.cutoff_masks_adj
+    mask = masks.get(frozenset(pair), 0) & get_shut_mask(voltages)
+    return (mask & -mask).bit_length()-1
+
+def get_shut_mask(voltages):
+    """
+    Bitmask of the shut voltage gates (bit i for the gate i)
+    """
+    mask = 0
+    for i in range(len(voltages)):
+        if voltages[i] == Utility.VOLTAGE_SHUT:
+            mask |= 1 << i
+    return mask
 
 def get_voltage_gate_values(flag):
     """
-    For output format
+    For output format - the gate i is named by its 1st node 'x{i//2+1}.{2*(i%2)+1}'
     """
     gate = None
-    if flag is 0:
-        gate = 'x11'
-    elif flag is 1:
-        gate = 'x12'
-    elif flag is 2:
-        gate = 'x21'
-    elif flag is 3:
-        gate = 'x22'
+    if flag >= 0:
+        gate = voltage_gate_node(flag//2+1, 2*(flag%2)+1)
     return gate
 
-def check_unibranch_validity(pair, positions, intersection):
+def check_unibranch_validity(pair, positions, nanowire_obj):
     """
-    Check if the pair is in the same branch
+    Check if the pair is in the same branch (of the intersection of the 1st particle)
     """
-    assert(intersection is not None)
+    slot = nanowire_obj.get_slot(positions[pair[0]-1])
+    assert(slot is not None)
     check = []
     for par in pair:
-        b = 0
-        pos = positions[par-1]
-        for branch in intersection:
-            b +=1
-            for tup in branch:
-                if not isinstance(tup, dict):
-                    continue
-                if pos in tup:
-                    check.append(b)
+        for k, b, _ in nanowire_obj.slots.get(positions[par-1], []):
+            if k == slot[0]:
+                check.append(b)
     if check[0] == check[1]:
         return True
     return False
@@ -188,10 +191,10 @@ def validate_particle_positions(nanowire_obj, nanowire_b, positions, branch_cfg,
 
     # 1. extracting the intersections of the particles
     for pos in positions:
-        inter = Utility.get_intersection(nanowire_obj.nanowire, pos)
-        intersections.append(nanowire_obj.nanowire.index(inter))
+        k = nanowire_obj.get_slot(pos)[0]
+        intersections.append(k)
         if n_branches == -1:
-            n_branches = len(inter)
+            n_branches = len(nanowire_obj.nanowire[k])
 
     # 2. extracting the branches of the particles
     for pos in positions:
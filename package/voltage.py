@@ -0,0 +1,93 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Voltage
+
+Objectives:
+    1. Vectorized voltage gate decisions (NumPy) for any # gates
+    2. A precomputed pair-to-gate incidence matrix - a row per cutoff position pair
+       (sorted pair keys), a column per voltage gate
+    3. The gates separating the isolated pairs of an occupancy are an OR (any)
+       reduction of the incidence rows of the pairs which aren't exempt
+
+Class: VoltageEngine
+
+Methods:
+    1. get_pairs
+    2. get_pair_rows
+    3. get_gates
+    4. get_shut_mask
+
+Functions:
+    1. pair_keys
+"""
+
+import numpy as np
+
+class VoltageEngine:
+    """
+    Pair-to-gate incidence of the ADJACENT cutoff pairs of a Nanowire
+        keys      - sorted keys (pair_keys) of the cutoff position (vertex id) pairs
+        incidence - incidence[r][i] if the gate i separates the pair of keys[r]
+    """
+
+    def __init__(self, nanowire_obj):
+        self.index = nanowire_obj.graph.index
+        self.n = len(nanowire_obj.vertices)
+        self.gates = len(nanowire_obj.cutoff_pairs_adj)
+        rows = {}
+        for pair, mask in nanowire_obj.cutoff_masks_adj.items():
+            p, q = [self.index[pos] for pos in pair]
+            rows[min(p, q)*self.n+max(p, q)] = mask
+        self.keys = np.array(sorted(rows), dtype=np.int64)
+        self.incidence = np.zeros((len(self.keys), self.gates), dtype=bool)
+        for r in range(len(self.keys)):
+            mask = rows[int(self.keys[r])]
+            for i in range(self.gates):
+                self.incidence[r][i] = (mask >> i) & 1
+
+    @classmethod
+    def get_pairs(cls, k):
+        """
+        The (i, j) index arrays of the pairs of k positions, in itertools.combinations order
+        """
+        return np.triu_indices(k, 1)
+
+    def get_pair_rows(self, ids, i, j):
+        """
+        The incidence rows of the position (vertex id) pairs (ids[i], ids[j]), -1 if
+        the pair isn't a cutoff pair
+        """
+        if len(self.keys) == 0:
+            return np.full(len(i), -1)
+        queries = pair_keys(ids[i], ids[j], self.n)
+        rows = np.minimum(np.searchsorted(self.keys, queries), len(self.keys)-1)
+        return np.where(self.keys[rows] == queries, rows, -1)
+
+    def get_gates(self, rows, exempt):
+        """
+        The gate vector (bool per gate) - the gates which separate a pair (row) that isn't exempt
+        """
+        rows = rows[(rows >= 0) & ~exempt]
+        return self.incidence[rows].any(axis=0)
+
+    @classmethod
+    def get_shut_mask(cls, gates):
+        """
+        The bitmask (bit i for the gate i) of a gate vector
+        """
+        mask = 0
+        for i in np.flatnonzero(gates):
+            mask |= 1 << int(i)
+        return mask
+
+def pair_keys(p, q, n):
+    """
+    Keys of the unordered pairs (p, q) of ids < n
+    """
+    p = np.asarray(p, dtype=np.int64)
+    q = np.asarray(q, dtype=np.int64)
+    return np.minimum(p, q)*n+np.maximum(p, q)
@@ -0,0 +1,157 @@
+"""
+License:
+    Copyright (C) 2020
+    All rights reserved.
+    Arahant Ashok Kumar (aak700@nyu.edu)
+
+Module: Zero Mode
+
+Objectives:
+    1. Indexed zero modes (the particle pairs on the same branch) of the Nanowire state
+    2. The branch -> occupants and particle -> partner maps are updated per moved
+       particle, instead of rescanning the Nanowire data structure
+    3. Pair and particle zero mode queries in constant time
+
+Class: ZeroModes
+
+Methods:
+    1. initiate_modes
+    2. move
+    3. get_pair
+    4. add_mode
+    5. remove_mode
+    6. get_zero_modes
+    7. get_partner
+    8. is_zero_mode
+
+Functions:
+    1. structure_zero_modes
+"""
+
+from collections import Counter
+
+class ZeroModes:
+    """
+    The zero modes of the Nanowire state, by its branches
+    """
+
+    def __init__(self, nanowire_obj):
+        self.branch_of = {}
+        self.occupants = {}
+        self.modes = Counter()
+        self.partners = {}
+
+        # the (intersection, branch)s of every position, as the Nanowire data structure
+        for pos, slots in nanowire_obj.slots.items():
+            branches = []
+            for k, b, _ in slots:
+                if (k, b) not in branches:
+                    branches.append((k, b))
+                self.occupants[(k, b)] = {}
+            self.branch_of[pos] = branches
+        self.initiate_modes(nanowire_obj.nanowire, nanowire_obj.slots)
+
+    def initiate_modes(self, nanowire, slots):
+        """
+        Index the particles of the Nanowire data structure (state)
+        """
+        for branch in self.occupants:
+            self.occupants[branch] = {}
+        self.modes = Counter()
+        self.partners = {}
+        for pos in self.branch_of:
+            k, b, t = slots[pos][0]
+            par = nanowire[k][b][t][pos]
+            if par != 0:
+                self.move(pos, par)
+
+    def move(self, pos, par):
+        """
+        The particle on pos is now par (0 - empty)
+        """
+        for branch in self.branch_of[pos]:
+            occupants = self.occupants[branch]
+            pair = ZeroModes.get_pair(occupants)
+            if pair is not None:
+                self.remove_mode(pair)
+            if par != 0:
+                occupants[pos] = par
+            else:
+                occupants.pop(pos, None)
+            pair = ZeroModes.get_pair(occupants)
+            if pair is not None:
+                self.add_mode(pair)
+
+    @classmethod
+    def get_pair(cls, occupants):
+        """
+        The pair of particles on a branch (position -> particle), None if it doesn't hold 2
+        """
+        if len(occupants) != 2:
+            return None
+        pair = frozenset(occupants.values())
+        if len(pair) != 2:
+            return None
+        return pair
+
+    def add_mode(self, pair):
+        """
+        A branch holds the pair (a shared branch counts once per intersection)
+        """
+        self.modes[pair] += 1
+        if self.modes[pair] == 1:
+            p1, p2 = pair
+            self.partners.setdefault(p1, set()).add(p2)
+            self.partners.setdefault(p2, set()).add(p1)
+
+    def remove_mode(self, pair):
+        """
+        A branch no longer holds the pair
+        """
+        self.modes[pair] -= 1
+        if self.modes[pair] == 0:
+            del self.modes[pair]
+            p1, p2 = pair
+            for par, other in ((p1, p2), (p2, p1)):
+                self.partners[par].discard(other)
+                if len(self.partners[par]) == 0:
+                    del self.partners[par]
+
+    def get_zero_modes(self):
+        """
+        The set of zero mode pairs (frozensets of particles)
+        """
+        return set(self.modes)
+
+    def get_partner(self, par):
+        """
+        The other particle of the zero mode of par, None if it isn't part of one
+        """
+        partners = self.partners.get(par)
+        if partners is None:
+            return None
+        return next(iter(partners))
+
+    def is_zero_mode(self, p1, p2):
+        """
+        Checks if the particles are a zero mode
+        """
+        return frozenset((p1, p2)) in self.modes
+
+def structure_zero_modes(nanowire):
+    """
+    The set of zero mode pairs of a Nanowire data structure (a full scan)
+    """
+    zmodes = set()
+    for intersection in nanowire:
+        for branch in intersection:
+            pair = []
+            for tup in branch:
+                if not isinstance(tup, dict):
+                    continue
+                par = list(tup.values())[0]
+                if par != 0:
+                    pair.append(par)
+            if len(pair)==2:
+                zmodes.add(frozenset(pair))
+    return zmodes